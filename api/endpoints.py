@@ -1,62 +1,158 @@
 """
 API endpoints for power meter data
 """
-import json
-import binascii
+import functools
+import gzip
 import logging
 import os
 import time
+import orjson
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import unquote_plus
 
-from modbus.protocol import parse_response
+from modbus.protocol import parse_response, to_modbus_address
 from config.settings import CONFIG
 
 logger = logging.getLogger('powermeter.api.endpoints')
 
+# orjson returns bytes directly, so no separate encode step is needed
+_dumps = orjson.dumps
+
+# Register values cluster in narrow ranges, so their hex strings are reused
+_hexstr = functools.lru_cache(maxsize=4096)(hex)
+
+# Largest number of registers a single Modbus read may request
+MAX_REGISTERS_PER_READ = 125
+
+def _parse_query(path):
+    """
+    Parse the query string of a request path into a flat dictionary
+    
+    Only the first non-empty value of each key is kept. Keys and values are
+    percent-decoded (with '+' as a space), so values such as a
+    comma-separated ?columns= list arrive intact from URLSearchParams and
+    other standard encoders.
+    
+    Parameters:
+    - path: Request path, optionally followed by ?query
+    
+    Returns:
+    - Dictionary mapping parameter names to string values
+    """
+    params = {}
+    for pair in path.partition('?')[2].split('&'):
+        key, _, value = pair.partition('=')
+        key = unquote_plus(key)
+        if value and key not in params:
+            params[key] = unquote_plus(value)
+    return params
+
+def _group_register_runs(register_nums, max_count=MAX_REGISTERS_PER_READ):
+    """
+    Group register numbers into runs of contiguous addresses
+    
+    Parameters:
+    - register_nums: Iterable of register numbers
+    - max_count: Maximum length of a single run
+    
+    Returns:
+    - List of [start, count] pairs covering every requested register
+    """
+    runs = []
+    for register_num in sorted(set(register_nums)):
+        if runs and register_num == runs[-1][0] + runs[-1][1] and runs[-1][1] < max_count:
+            runs[-1][1] += 1
+        else:
+            runs.append([register_num, 1])
+    return runs
+
 class PowerMeterHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for power meter API endpoints"""
     
-    # This will be set by the server
+    # Keep connections open between dashboard polls; every response
+    # carries a Content-Length so the connection can be reused
+    protocol_version = 'HTTP/1.1'
+    
+    # Seconds an idle keep-alive connection may hold a worker thread
+    timeout = 15
+    
+    # These will be set by the server
     data_manager = None
+    coalescer = None
+    
+    # Dashboard template, loaded once by load_index_template()
+    _index_html = None
+    _index_html_gz = None
+    
+    @classmethod
+    def load_index_template(cls):
+        """Read the dashboard template for the configured style into memory"""
+        dashboard_style = CONFIG.get('DASHBOARD_STYLE', 'classic')
+        
+        if dashboard_style == 'modern':
+            template_name = 'monitor_modern.html'
+        else:
+            template_name = 'monitor.html'  # Classic Spanish version
+            
+        template_path = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)),
+            'web', 'templates', template_name
+        )
+        
+        try:
+            with open(template_path, 'rb') as f:
+                html = f.read()
+        except FileNotFoundError:
+            logger.warning(f"Dashboard template not found: {template_path}")
+            html = b"<html><body><h1>Template not found</h1></body></html>"
+            
+        cls._index_html_gz = gzip.compress(html, 6)
+        cls._index_html = html
     
     def do_GET(self):
         """Handle GET requests"""
         if self.path == '/api/config':
             # Serve configuration data to JavaScript
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
             config_data = {
                 'API_BASE_URL': CONFIG.get('API_BASE_URL', 'http://localhost:8080/api'),
                 'DASHBOARD_STYLE': CONFIG.get('DASHBOARD_STYLE', 'classic')
             }
-            self.wfile.write(json.dumps(config_data).encode('utf-8'))
+            self._send_json(_dumps(config_data))
             
         elif self.path == '/api/power':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')  # Enable CORS for testing
-            self.end_headers()
+            # Serve the payload the data manager already serialized this poll
+            if self.data_manager:
+                payload, etag, last_modified = self.data_manager.get_snapshot()
+            else:
+                payload, etag, last_modified = b'{}', '"0"', 0.0
             
-            # Get the latest data from the data manager
-            data = self.data_manager.get_data() if self.data_manager else {}
-            self.wfile.write(json.dumps(data).encode('utf-8'))
+            # Let polling clients revalidate without re-downloading unchanged data
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                return
             
-        elif self.path == '/api/recent_readings':
-            # Get recent readings from database
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            self._send_json(payload, etag=etag, last_modified=last_modified)
             
-            if self.data_manager and hasattr(self.data_manager, 'db_handler'):
-                readings = self.data_manager.db_handler.get_recent_readings(50)
-                self.wfile.write(json.dumps(readings).encode('utf-8'))
-            else:
-                self.wfile.write(json.dumps([]).encode('utf-8'))
+        elif self.path == '/api/recent_readings' or self.path.startswith('/api/recent_readings?'):
+            # Get recent readings from database, optionally only some columns
+            # and optionally as one list per column (?layout=columns)
+            params = _parse_query(self.path)
+            columns = params['columns'].split(',') if 'columns' in params else None
+            columnar = params.get('layout') == 'columns'
+            try:
+                if not (self.data_manager and hasattr(self.data_manager, 'db_handler')):
+                    readings = {} if columnar else []
+                elif columnar:
+                    readings = self.data_manager.db_handler.get_recent_readings_columnar(50, columns)
+                else:
+                    readings = self.data_manager.db_handler.get_recent_readings(50, columns)
+            except ValueError as e:
+                self._send_text(400, str(e).encode())
+                return
+            self._send_json(_dumps(readings))
                 
         elif self.path.startswith('/api/register/'):
             # Extract register number from path
@@ -64,159 +160,213 @@ class PowerMeterHTTPHandler(BaseHTTPRequestHandler):
                 register_num = int(self.path.split('/api/register/')[1])
                 self.handle_register_request(register_num)
             except (ValueError, IndexError):
-                self.send_response(400)
-                self.end_headers()
-                self.wfile.write(b'Invalid register number')
+                self._send_text(400, b'Invalid register number')
         elif self.path.startswith('/api/read_registers'):
             # Parse query string
-            parsed_url = urlparse(self.path)
-            params = parse_qs(parsed_url.query)
+            params = _parse_query(self.path)
             
-            start = int(params.get('start', ['44001'])[0])
-            count = min(int(params.get('count', ['1'])[0]), 125)  # Limit to 125 registers
+            start = int(params.get('start', '44001'))
+            count = min(int(params.get('count', '1')), MAX_REGISTERS_PER_READ)
+            include_hex = params.get('hex') == '1'
             
-            self.handle_registers_range_request(start, count)
+            self.handle_registers_range_request(start, count, include_hex)
         elif self.path.startswith('/api/modbus_command'):
             # Parse query string
-            parsed_url = urlparse(self.path)
-            params = parse_qs(parsed_url.query)
+            params = _parse_query(self.path)
             
-            command_hex = params.get('command', [''])[0]
+            command_hex = params.get('command', '')
             self.handle_modbus_command(command_hex)
         elif self.path == '/' or self.path == '/index.html':
+            if self._index_html is None:
+                self.load_index_template()
+                
+            # Serve the preloaded template, compressed if the client accepts it
+            use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = self._index_html_gz if use_gzip else self._index_html
+                
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'public, max-age=300')
+            self.send_header('Vary', 'Accept-Encoding')
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
             self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_text(404, b'Not found')
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        if self.path == '/api/register_batch':
+            # Body is a JSON array of register numbers
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                register_nums = orjson.loads(self.rfile.read(length))
+                if (not isinstance(register_nums, list) or not register_nums or
+                        not all(type(r) is int for r in register_nums)):
+                    raise ValueError("expected a non-empty list of register numbers")
+            except ValueError:
+                self._send_text(400, b'Invalid register list')
+                return
             
-            # Serve HTML template based on dashboard style
-            dashboard_style = CONFIG.get('DASHBOARD_STYLE', 'classic')
-            
-            if dashboard_style == 'modern':
-                template_name = 'monitor_modern.html'
-            else:
-                template_name = 'monitor.html'  # Classic Spanish version
+            if len(register_nums) > MAX_REGISTERS_PER_READ:
+                self._send_text(400, f'Too many registers (max {MAX_REGISTERS_PER_READ})'.encode('utf-8'))
+                return
                 
-            template_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                'web', 'templates', template_name
-            )
-            
-            try:
-                with open(template_path, 'rb') as f:
-                    self.wfile.write(f.read())
-            except FileNotFoundError:
-                self.wfile.write(b"<html><body><h1>Template not found</h1></body></html>")
+            self.handle_register_batch_request(register_nums)
         else:
-            self.send_response(404)
-            self.end_headers()
-            self.wfile.write(b'Not found')
+            self._send_text(404, b'Not found')
+    
+    def do_OPTIONS(self):
+        """Answer CORS preflight requests"""
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+    
+    def _register_reader(self):
+        """
+        Get the object register reads should go through
+        
+        Returns:
+        - The server's ReaderCoalescer if running, otherwise the data manager's reader
+        """
+        if self.coalescer is not None:
+            return self.coalescer
+        return self.data_manager.reader
     
     def handle_register_request(self, register_num):
         """Handle a request for a specific register"""
         if not self.data_manager or not hasattr(self.data_manager.reader, 'read_register'):
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(b'No reader available')
+            self._send_text(500, b'No reader available')
             return
             
         try:
-            # Convert from 4xxxx format to modbus address (subtract 40001)
-            modbus_address = register_num
-            if register_num >= 40001:
-                modbus_address = register_num - 40001
-                
             # Read the register
-            register_value = self.data_manager.reader.read_register(register_num)
+            register_value = self._register_reader().read_register(register_num)
                 
             if register_value is None:
-                self.send_response(404)
-                self.end_headers()
-                self.wfile.write(f'Failed to read register {register_num}'.encode('utf-8'))
+                self._send_text(404, f'Failed to read register {register_num}'.encode('utf-8'))
                 return
                     
             # Create response
+            modbus_address = to_modbus_address(register_num)
             response = {
                 'register': register_num,
                 'modbus_address': modbus_address,
-                'modbus_address_hex': hex(modbus_address),
+                'modbus_address_hex': _hexstr(modbus_address),
                 'value': register_value,
-                'hex_value': hex(register_value),
+                'hex_value': _hexstr(register_value),
                 'timestamp': time.time()
             }
                     
             # Send the response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self._send_json(_dumps(response))
                 
         except Exception as e:
             logger.error(f"Error reading register {register_num}: {str(e)}")
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(f'Error: {str(e)}'.encode('utf-8'))
+            self._send_text(500, f'Error: {str(e)}'.encode('utf-8'))
     
-    def handle_registers_range_request(self, start, count):
-        """Handle a request for a range of registers"""
+    def handle_register_batch_request(self, register_nums):
+        """
+        Handle a request for an arbitrary list of registers
+        
+        Contiguous registers are read with a single Modbus transaction and
+        the results are returned in the order they were requested.
+        """
         if not self.data_manager or not hasattr(self.data_manager.reader, 'read_registers'):
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(b'No reader available')
+            self._send_text(500, b'No reader available')
+            return
+            
+        try:
+            # Read each contiguous run once
+            values = {}
+            for start, count in _group_register_runs(register_nums):
+                registers = self._register_reader().read_registers(start, count)
+                if registers:
+                    for offset, value in enumerate(registers):
+                        values[start + offset] = value
+            
+            if not values:
+                self._send_text(404, b'Failed to read registers')
+                return
+            
+            # Stitch results back into request order; unreadable registers are null
+            timestamp = time.time()
+            response = []
+            for register_num in register_nums:
+                response.append({
+                    'register': register_num,
+                    'modbus_address': to_modbus_address(register_num),
+                    'value': values.get(register_num),
+                    'timestamp': timestamp
+                })
+            
+            # Send the response
+            self._send_json(_dumps(response))
+            
+        except Exception as e:
+            logger.error(f"Error reading register batch {register_nums}: {str(e)}")
+            self._send_text(500, f'Error: {str(e)}'.encode('utf-8'))
+    
+    def handle_registers_range_request(self, start, count, include_hex=False):
+        """
+        Handle a request for a range of registers
+        
+        Hex strings for the values are only built when include_hex is set
+        (?hex=1); clients can derive them from the integer values.
+        """
+        if not self.data_manager or not hasattr(self.data_manager.reader, 'read_registers'):
+            self._send_text(500, b'No reader available')
             return
             
         try:
             # Read the registers
-            registers = self.data_manager.reader.read_registers(start, count)
+            registers = self._register_reader().read_registers(start, count)
             
             if registers is None or len(registers) == 0:
-                self.send_response(404)
-                self.end_headers()
-                self.wfile.write(f'Failed to read registers {start}-{start+count-1}'.encode('utf-8'))
+                self._send_text(404, f'Failed to read registers {start}-{start+count-1}'.encode('utf-8'))
                 return
                 
             # Calculate modbus address
-            modbus_start = start
-            if start >= 40001:
-                modbus_start = start - 40001
+            modbus_start = to_modbus_address(start)
                 
             # Create response
             response = {
                 'start_register': start,
                 'modbus_start': modbus_start,
-                'modbus_address_hex': hex(modbus_start),
+                'modbus_address_hex': _hexstr(modbus_start),
                 'count': len(registers),
                 'values': registers,
-                'hex_values': [hex(val) for val in registers],
                 'timestamp': time.time()
             }
+            if include_hex:
+                response['hex_values'] = list(map(_hexstr, registers))
                 
             # Send the response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self._send_json(_dumps(response))
             
         except Exception as e:
             logger.error(f"Error reading registers {start}-{start+count-1}: {str(e)}")
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(f'Error: {str(e)}'.encode('utf-8'))
+            self._send_text(500, f'Error: {str(e)}'.encode('utf-8'))
     
     def handle_modbus_command(self, command_hex):
         """Handle a request to send a raw Modbus command"""
         if not self.data_manager or not hasattr(self.data_manager.reader, 'modbus_client'):
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(b'No Modbus client available')
+            self._send_text(500, b'No Modbus client available')
             return
             
         try:
             # Convert hex string to bytes
-            command = binascii.unhexlify(command_hex)
+            command = bytes.fromhex(command_hex)
+        except ValueError:
+            self._send_text(400, b'Invalid hex string')
+            return
             
-            logger.info(f"Sending raw Modbus command: {binascii.hexlify(command).decode()}")
+        try:
+            logger.info(f"Sending raw Modbus command: {command.hex()}")
             
             # Get the Modbus client
             client = self.data_manager.reader.modbus_client
@@ -225,43 +375,75 @@ class PowerMeterHTTPHandler(BaseHTTPRequestHandler):
             response = client.send_command(command)
             
             if not response:
-                self.send_response(404)
-                self.end_headers()
-                self.wfile.write(b'No response received')
+                self._send_text(404, b'No response received')
                 return
                 
             # Parse the response
-            parsed = parse_response(command, response)
-            
-            # Convert bytes to list of integers
-            response_list = list(response)
+            parsed = parse_response(command, response, include_hex=True)
             
+            # Frames are sent as hex strings only; clients decode the bytes
             response_data = {
-                'command': list(command),
-                'command_hex': binascii.hexlify(command).decode(),
-                'response': response_list,
-                'response_hex': binascii.hexlify(response).decode(),
+                'command_hex': command.hex(),
+                'response_hex': response.hex(),
                 'parsed': parsed,
                 'timestamp': time.time()
             }
                 
             # Send the response
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response_data).encode('utf-8'))
+            self._send_json(_dumps(response_data))
             
-        except binascii.Error:
-            self.send_response(400)
-            self.end_headers()
-            self.wfile.write(b'Invalid hex string')
         except Exception as e:
             logger.error(f"Error sending Modbus command: {str(e)}")
-            self.send_response(500)
-            self.end_headers()
-            self.wfile.write(f'Error: {str(e)}'.encode('utf-8'))
+            self._send_text(500, f'Error: {str(e)}'.encode('utf-8'))
+    
+    def _send_json(self, payload, status=200, etag=None, last_modified=None):
+        """
+        Send a pre-serialized JSON payload
+        
+        Parameters:
+        - payload: JSON document as bytes
+        - status: HTTP status code
+        - etag: Optional entity tag; clients are told to revalidate with it
+        - last_modified: Optional modification time in epoch seconds
+        """
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(payload)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if last_modified:
+            self.send_header('Last-Modified', self.date_time_string(last_modified))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def _send_text(self, status, body):
+        """
+        Send a plain-text response
+        
+        Error responses close the connection so a partly read request
+        body cannot be mistaken for the next request.
+        
+        Parameters:
+        - status: HTTP status code
+        - body: Response body as bytes
+        """
+        self.send_response(status)
+        self.send_header('Content-type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        if status >= 400:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def end_headers(self):
+        """Close the connection after this response when the server is short of workers"""
+        if not self.close_connection and not self.server.allow_keep_alive():
+            self.send_header('Connection', 'close')
+        super().end_headers()
     
     def log_message(self, format, *args):
         """Override to use our own logging"""
-        logger.debug(f"{self.client_address[0]} - {format % args}")
\ No newline at end of file
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{self.client_address[0]} - {format % args}")
\ No newline at end of file
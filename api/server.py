@@ -1,14 +1,110 @@
 """
 HTTP server for exposing power meter data via API
 """
+import socket
 import threading
-from http.server import ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
 import logging
 
 from api.endpoints import PowerMeterHTTPHandler
+from config.settings import CONFIG
+from core.coalescer import ReaderCoalescer
 
 logger = logging.getLogger('powermeter.api.server')
 
+# Seconds a new connection waits for a free worker before it is refused
+ADMISSION_TIMEOUT = 5
+
+# Sent to connections refused because every worker stayed busy
+_BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Length: 0\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server that hands connections to a fixed-size worker pool
+    instead of spawning a new thread per connection"""
+    
+    def __init__(self, server_address, handler_class, max_workers=16):
+        """
+        Initialize the pooled server
+        
+        Parameters:
+        - server_address: (host, port) tuple to bind to
+        - handler_class: Request handler class
+        - max_workers: Maximum number of concurrent request workers
+        """
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='powermeter-http'
+        )
+        # Connections are only accepted onto the pool while a worker is
+        # free, so none sit in an unbounded queue
+        self._workers = threading.BoundedSemaphore(max_workers)
+        # An idle keep-alive connection holds its worker, so only up to
+        # half the pool may be kept open between requests
+        self._keep_alive_limit = max(1, max_workers // 2)
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+    
+    def process_request(self, request, client_address):
+        """Hand the connection to a free worker, or refuse it if none frees up"""
+        if not self._workers.acquire(timeout=ADMISSION_TIMEOUT):
+            logger.warning(f"All HTTP workers busy; refusing connection from {client_address[0]}")
+            try:
+                request.sendall(_BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # The pool has been shut down
+            self._workers.release()
+            self.shutdown_request(request)
+    
+    def allow_keep_alive(self):
+        """
+        Check whether a connection may stay open after its response
+        
+        Returns:
+        - True while the open connections, including the caller's, fit
+          within the keep-alive limit
+        """
+        return len(self._connections) <= self._keep_alive_limit
+    
+    def _process_request_worker(self, request, client_address):
+        """Handle one connection on a pool worker"""
+        with self._connections_lock:
+            self._connections.add(request)
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._connections_lock:
+                self._connections.discard(request)
+            self.shutdown_request(request)
+            self._workers.release()
+    
+    def server_close(self):
+        """Close the listening socket and release the worker pool"""
+        super().server_close()
+        
+        # Wake workers waiting on idle keep-alive connections
+        with self._connections_lock:
+            for request in self._connections:
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 class PowerMeterHTTPServer:
     """HTTP server for exposing power meter data via API"""
     
@@ -23,14 +119,27 @@ class PowerMeterHTTPServer:
         self.port = port
         self.data_manager = data_manager
         self.server = None
+        self.coalescer = None
         
     def start(self):
         """Start the HTTP server"""
         # Set the data manager for the handler
         PowerMeterHTTPHandler.data_manager = self.data_manager
         
+        # Share Modbus reads between concurrent register requests
+        self.coalescer = ReaderCoalescer(self.data_manager.reader)
+        self.coalescer.start()
+        PowerMeterHTTPHandler.coalescer = self.coalescer
+        
+        # Load the dashboard template once instead of on every request
+        PowerMeterHTTPHandler.load_index_template()
+        
         # Create and start the server
-        self.server = ThreadingHTTPServer(('', self.port), PowerMeterHTTPHandler)
+        self.server = PooledHTTPServer(
+            ('', self.port),
+            PowerMeterHTTPHandler,
+            CONFIG.get('HTTP_MAX_WORKERS', 16)
+        )
         server_thread = threading.Thread(target=self.server.serve_forever)
         server_thread.daemon = True
         server_thread.start()
@@ -41,4 +150,7 @@ class PowerMeterHTTPServer:
         if self.server:
             self.server.shutdown()
             self.server.server_close()
-            logger.info("HTTP server stopped")
\ No newline at end of file
+            logger.info("HTTP server stopped")
+        if self.coalescer:
+            self.coalescer.stop()
+            self.coalescer = None
@@ -1,5 +1,6 @@
 import logging
 import os
+from types import MappingProxyType
 
 # Ensure log directory exists
 log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
@@ -15,8 +16,8 @@ logging.basicConfig(
     ]
 )
 
-# Power Meter Configuration
-CONFIG = {
+# Power Meter Configuration (read-only; edit the values here)
+CONFIG = MappingProxyType({
     # Serial port settings
     'SERIAL_PORT': 'COM4',     # Change this to match your power meter's port
     'BAUD_RATE': 9600,         # Common baud rate for Modbus devices
@@ -25,6 +26,7 @@ CONFIG = {
     
     # Server settings
     'HTTP_PORT': 8080,         # Port for the HTTP API server
+    'HTTP_MAX_WORKERS': 16,    # Worker threads serving API connections
     'WEB_PORT': 8000,          # Port for the web interface
     'API_BASE_URL': 'http://localhost:8080/api',  # Base URL for API endpoints
     
@@ -35,6 +37,10 @@ CONFIG = {
     'USE_DATABASE': False,      # Enable/disable database storage
     'DATABASE_PATH': os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'power_meter.accdb'),
     'DATABASE_TABLE': 'meter_readings',
+    'DB_BATCH_SIZE': 12,        # Readings buffered per database commit
+    'DB_FLUSH_INTERVAL': 60,    # Max seconds a reading waits before commit
+    'DB_QUEUE_SIZE': 10000,     # Readings held while the database is busy
+    'DB_READ_CACHE_TTL': 1.0,   # Seconds recent-readings queries are reused
     
     # Test database settings (separate from production)
     'TEST_DATABASE_PATH': os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'power_meter_test.accdb'),
@@ -43,8 +49,10 @@ CONFIG = {
     
     # Operation settings
     'POLL_INTERVAL': 5,        # Seconds between meter readings
+    'SLOW_POLL_INTERVAL': 0,   # Seconds between counter reads (detailed data); 0 reads them every poll
     'DETAILED_DATA': True,     # Whether to read detailed (per-phase) data
     'DEFAULT_SCALAR': 3,       # Default scalar based on your meter
+    'SIMULATOR_CACHE_TTL': 0.1,  # Seconds simulated values are shared between reads
     
     # Manual scaling overrides (use these regardless of scalar value from meter)
     'OVERRIDE_SCALING': False,  # Set to False to use scalar from the meter
@@ -63,8 +71,9 @@ CONFIG = {
     'SERIAL_XONXOFF': False,   # No software flow control
     'SERIAL_RTSCTS': False,    # No hardware (RTS/CTS) flow control
     'SERIAL_DSRDTR': False,    # No hardware (DSR/DTR) flow control
+    'SERIAL_LOW_LATENCY': True,  # Ask USB adapters to forward replies immediately (Linux)
     
     # Modbus settings
     'MODBUS_TIMEOUT': 1,       # Timeout for Modbus operations
     'MODBUS_RETRIES': 3,       # Number of retries for failed Modbus operations
-}
\ No newline at end of file
+})
\ No newline at end of file
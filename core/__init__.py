@@ -11,11 +11,13 @@ Core Components:
     database_handler: Database operations and connectivity
     reader: Hardware communication with power meters
     simulator: Power meter data simulation for testing
+    coalescer: Merging of concurrent register reads
 
 Functions and Classes:
     PowerMeterReader: Hardware communication interface
     PowerMeterDataManager: Data collection and management
     PowerMeterSimulator: Simulated power meter for testing
+    ReaderCoalescer: Shares Modbus reads between concurrent requests
     run_production_application: Main production application function
 """
 
@@ -25,6 +27,7 @@ __version__ = '1.0.0'
 from .data_manager import PowerMeterDataManager
 from .reader import PowerMeterReader
 from .simulator import PowerMeterSimulator
+from .coalescer import ReaderCoalescer
 
 # Import the main application function
 try:
@@ -38,5 +41,6 @@ __all__ = [
     'PowerMeterDataManager', 
     'PowerMeterReader', 
     'PowerMeterSimulator',
+    'ReaderCoalescer',
     'run_production_application'
 ]
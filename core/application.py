@@ -8,7 +8,7 @@ feature module rather than the entry point.
 
 import signal
 import sys
-import time
+import threading
 import logging
 import os
 
@@ -23,14 +23,17 @@ from web import start_smart_server as start_web_server
 
 logger = logging.getLogger('powermeter.application')
 
-# Flag to control application running state
-running = True
+# Set to stop the application
+shutdown_event = threading.Event()
+
+# Longest the main thread blocks at a time. Untimed waits are not
+# interrupted by Ctrl+C on Windows, so the wait is re-armed periodically.
+SHUTDOWN_POLL_SECONDS = 5
 
 def signal_handler(sig, frame):
     """Handle shutdown signals gracefully"""
     logger.info("Shutdown signal received")
-    global running
-    running = False
+    shutdown_event.set()
 
 def run_production_application():
     """
@@ -95,10 +98,9 @@ def run_production_application():
         logger.info(f"System running. HTTP API available at http://localhost:{CONFIG['HTTP_PORT']}/")
         logger.info("Press Ctrl+C to exit.")
         
-        # Keep main thread alive
-        global running
-        while running:
-            time.sleep(1)
+        # Keep main thread alive until a shutdown signal arrives
+        while not shutdown_event.wait(SHUTDOWN_POLL_SECONDS):
+            pass
             
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
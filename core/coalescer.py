@@ -0,0 +1,171 @@
+"""
+Request coalescing for concurrent register reads
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger('powermeter.core.coalescer')
+
+# Largest number of registers a single Modbus read may request
+MAX_SPAN = 125
+
+class ReaderCoalescer:
+    """
+    Merges register reads that arrive close together into shared Modbus
+    transactions
+    
+    Requests are queued and drained by a single worker thread. Requests that
+    arrive within batch_window seconds of each other are grouped, and
+    overlapping or adjacent ranges are served by one read_registers call.
+    Exposes the same read_register/read_registers interface as the reader.
+    """
+    
+    def __init__(self, reader, batch_window=0.005, max_batch=32, timeout=5):
+        """
+        Initialize the coalescer
+        
+        Parameters:
+        - reader: PowerMeterReader (or simulator) to read from
+        - batch_window: Seconds to wait for more requests before reading
+        - max_batch: Maximum number of requests merged into one batch
+        - timeout: Seconds a caller waits for its result
+        """
+        self.reader = reader
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+    
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._worker, name='powermeter-coalescer')
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the worker thread after pending requests are served"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=self.timeout)
+            self._thread = None
+    
+    def request(self, register_address, register_count=1):
+        """
+        Queue a read of a register range
+        
+        Parameters:
+        - register_address: Starting register address
+        - register_count: Number of registers to read
+        
+        Returns:
+        - Future resolving to a list of register values, or None on error
+        """
+        future = Future()
+        self._queue.put((register_address, register_count, future))
+        return future
+    
+    def read_register(self, register_address):
+        """
+        Read a single register through the coalescer
+        
+        Returns:
+        - Register value or None if error
+        """
+        values = self.request(register_address, 1).result(self.timeout)
+        return values[0] if values else None
+    
+    def read_registers(self, register_address, register_count):
+        """
+        Read multiple registers through the coalescer
+        
+        Returns:
+        - List of register values or None if error
+        """
+        return self.request(register_address, register_count).result(self.timeout)
+    
+    def _worker(self):
+        """Drain the queue in small batches until stopped"""
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            # Collect whatever else arrives within the batch window
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            
+            self._process_batch(batch)
+    
+    def _process_batch(self, batch):
+        """
+        Serve a batch of requests with as few reads as possible
+        
+        Parameters:
+        - batch: List of (register_address, register_count, future) tuples
+        """
+        batch.sort(key=lambda item: item[0])
+        
+        # Merge overlapping or adjacent ranges into spans of at most MAX_SPAN
+        spans = []
+        for start, count, future in batch:
+            end = start + count
+            if spans and start <= spans[-1][1] and max(end, spans[-1][1]) - spans[-1][0] <= MAX_SPAN:
+                spans[-1][1] = max(end, spans[-1][1])
+                spans[-1][2].append((start, count, future))
+            else:
+                spans.append([start, end, [(start, count, future)]])
+        
+        for span_start, span_end, requests in spans:
+            values = self._read(span_start, span_end - span_start)
+            
+            if len(requests) > 1:
+                logger.debug(f"Coalesced {len(requests)} requests into one read of {span_start}-{span_end - 1}")
+                
+                # One bad register (e.g. an unmapped address) fails the whole
+                # span, so requests for different ranges get their own reads
+                ranges = {(start, count) for start, count, future in requests}
+                if (values is None or len(values) < span_end - span_start) and len(ranges) > 1:
+                    logger.debug(f"Read of {span_start}-{span_end - 1} failed; retrying {len(ranges)} ranges separately")
+                    results = {(start, count): self._read(start, count) for start, count in ranges}
+                    for start, count, future in requests:
+                        future.set_result(results[(start, count)])
+                    continue
+            
+            for start, count, future in requests:
+                offset = start - span_start
+                if values is not None and len(values) >= offset + count:
+                    future.set_result(values[offset:offset + count])
+                else:
+                    future.set_result(None)
+    
+    def _read(self, register_address, register_count):
+        """
+        Read a register range from the meter
+        
+        Returns:
+        - List of register values or None if the read failed
+        """
+        try:
+            return self.reader.read_registers(register_address, register_count)
+        except Exception as e:
+            logger.error(f"Error reading registers {register_address}-{register_address + register_count - 1}: {str(e)}")
+            return None
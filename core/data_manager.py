@@ -4,6 +4,9 @@ Data manager for collecting and storing power meter data
 import time
 import threading
 import logging
+import hashlib
+import orjson
+from config.settings import CONFIG
 from .database_handler import DatabaseHandler
 
 logger = logging.getLogger('powermeter.core.data_manager')
@@ -24,7 +27,11 @@ class PowerMeterDataManager:
         self.meter_data = {}
         self.running = False
         self._thread = None
+        self._stop_event = threading.Event()
         self.db_handler = DatabaseHandler()
+        # (payload, etag, last_modified) for the latest reading; replaced as
+        # a whole so readers never need a lock
+        self._snapshot = (b'{}', '"0"', 0.0)
     
     def get_data(self):
         """
@@ -35,33 +42,82 @@ class PowerMeterDataManager:
         """
         return self.meter_data
     
+    def get_data_json(self):
+        """
+        Get the latest meter data as serialized JSON
+        
+        Returns:
+        - JSON bytes of the latest meter data
+        """
+        return self._snapshot[0]
+    
+    def get_snapshot(self):
+        """
+        Get the latest meter data in ready-to-send form
+        
+        The payload and its ETag are computed once per poll, so API requests
+        only have to write them out.
+        
+        Returns:
+        - Tuple of (JSON bytes, ETag, last-modified time in epoch seconds)
+        """
+        return self._snapshot
+    
+    def _update_data(self, data):
+        """
+        Publish a new reading and its serialized form
+        
+        Parameters:
+        - data: Dictionary of meter data
+        """
+        payload = orjson.dumps(data)
+        etag = f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+        # Readings are stamped when sampled; reuse that instead of the clock
+        sample_time = data.get('timestamp') or time.time()
+        self.meter_data = data
+        self._snapshot = (payload, etag, sample_time)
+    
     def _read_meter_loop(self):
         """Background thread for continuously reading meter data"""
-        from config.settings import CONFIG
+        # Use detailed data if configured, otherwise use basic data
+        if CONFIG.get('DETAILED_DATA', False):
+            read_data = self.reader.read_detailed_data
+        else:
+            read_data = self.reader.read_basic_data
         
+        # Polls are scheduled against fixed deadlines so the time spent
+        # reading doesn't add to the interval
+        next_poll = time.monotonic()
         while self.running:
             try:
-                # Use detailed data if configured, otherwise use basic data
-                if CONFIG.get('DETAILED_DATA', False):
-                    data = self.reader.read_detailed_data()
-                else:
-                    data = self.reader.read_basic_data()
+                data = read_data()
                     
                 if data is not None:
-                    self.meter_data = data
+                    self._update_data(data)
                     
                     # Store in database if enabled
                     if self.db_handler.enabled:
                         self.db_handler.store_reading(data)
                     
                     # Log a summary of the data
-                    power = data.get('system', {}).get('power_kw', data.get('power_kw', 'N/A'))
-                    logger.info(f"Updated readings: Power={power}kW")
+                    if logger.isEnabledFor(logging.INFO):
+                        system = data.get('system')
+                        if system and 'power_kw' in system:
+                            power = system['power_kw']
+                        else:
+                            power = data.get('power_kw', 'N/A')
+                        logger.info(f"Updated readings: Power={power}kW")
             except Exception as e:
                 logger.error(f"Error in meter reading loop: {str(e)}")
                 
-            # Sleep until next reading
-            time.sleep(self.poll_interval)
+            # Wait until next reading, waking immediately on stop(). If a
+            # read overran the interval, start counting again from now.
+            next_poll += self.poll_interval
+            now = time.monotonic()
+            if next_poll < now:
+                next_poll = now
+            if self._stop_event.wait(next_poll - now):
+                break
     
     def start(self):
         """Start collecting data"""
@@ -70,6 +126,7 @@ class PowerMeterDataManager:
             return
             
         self.running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._read_meter_loop)
         self._thread.daemon = True
         self._thread.start()
@@ -78,8 +135,9 @@ class PowerMeterDataManager:
     def stop(self):
         """Stop collecting data"""
         self.running = False
+        self._stop_event.set()
         if self._thread is not None:
-            self._thread.join(timeout=10)
+            self._thread.join()
             self._thread = None
         
         # Close database connection
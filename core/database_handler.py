@@ -2,14 +2,147 @@
 Database handler for storing power meter data in MS Access
 Supports separate production and test databases with different schemas
 """
+import csv
 import logging
 import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
 import pyodbc
 from datetime import datetime
 from config.settings import CONFIG
 
 logger = logging.getLogger('powermeter.core.database_handler')
 
+# Let the driver manager keep connections alive between connect calls
+pyodbc.pooling = True
+
+# Connections shared by every handler writing to the same database file:
+# db_path -> [connection, number of handlers using it]
+_connections = {}
+# Locks serialising use of each shared connection, keyed by db_path
+_connection_locks = {}
+_connections_lock = threading.Lock()
+
+# (db_path, table_name) pairs whose table and index are known to exist
+_schema_ready = set()
+
+# Backoff between attempts to write a batch while the database is unavailable
+_RETRY_DELAY_MIN = 0.1
+_RETRY_DELAY_MAX = 5.0
+_MAX_WRITE_ATTEMPTS = 20
+
+# Table names are interpolated into SQL, so only plain identifiers are allowed
+_TABLE_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]{0,63}$')
+
+_INSERT_SQL = "INSERT INTO {table} ({columns}) VALUES ({params})"
+_RECENT_SQL = "SELECT TOP {{limit}} {{columns}} FROM {table} ORDER BY [timestamp] DESC"
+_BULK_INSERT_SQL = (
+    "INSERT INTO {table} ({columns}) SELECT {columns} "
+    "FROM [Text;FMT=Delimited;HDR=Yes;DATABASE={directory}].[{file}]"
+)
+
+# Text driver column types for bulk loads; anything not listed is Double
+_CSV_COLUMN_TYPES = {
+    'timestamp': 'DateTime',
+    'test_name': 'Text',
+    'test_type': 'Text',
+    'test_status': 'Text',
+    'notes': 'Memo',
+    'data_scalar': 'Long',
+    'simulated': 'Short',
+}
+
+# Test metadata columns: (column, default)
+_TEST_FIELDS = (
+    ('test_name', 'Unknown Test'),
+    ('test_type', 'simulation'),
+    ('test_duration', 0),
+    ('test_status', 'running'),
+    ('notes', ''),
+)
+
+# Reading columns shared by both tables: (column, section, key, fallback).
+# The value is data[section][key], falling back to data[fallback] when the
+# section value is missing or None (a reading of 0 is kept); a section of
+# None reads data[fallback] directly
+# and a fallback of None reads only the section.
+_READING_FIELDS = (
+    ('power_kw', 'system', 'power_kw', 'power_kw'),
+    ('reactive_power_kvar', 'system', 'reactive_power_kvar', 'reactive_power_kvar'),
+    ('apparent_power_kva', 'system', 'apparent_power_kva', 'apparent_power_kva'),
+    ('energy_kwh', 'system', 'energy_kwh', 'energy_kwh'),
+    ('power_factor', 'system', 'displacement_pf', 'power_factor'),
+    ('current_avg', 'system', 'current_avg', 'current_avg'),
+    ('voltage_ll_avg', 'system', 'voltage_ll_avg', 'voltage_ll_avg'),
+    ('voltage_ln_avg', 'system', 'voltage_ln_avg', 'voltage_ln_avg'),
+    ('frequency', None, None, 'frequency'),
+    ('phase1_power_kw', 'phase_1', 'power_kw', None),
+    ('phase1_current', 'phase_1', 'current', None),
+    ('phase1_voltage_ln', 'phase_1', 'voltage_ln', None),
+    ('phase1_pf', 'phase_1', 'displacement_pf', None),
+    ('phase2_power_kw', 'phase_2', 'power_kw', None),
+    ('phase2_current', 'phase_2', 'current', None),
+    ('phase2_voltage_ln', 'phase_2', 'voltage_ln', None),
+    ('phase2_pf', 'phase_2', 'displacement_pf', None),
+    ('phase3_power_kw', 'phase_3', 'power_kw', None),
+    ('phase3_current', 'phase_3', 'current', None),
+    ('phase3_voltage_ln', 'phase_3', 'voltage_ln', None),
+    ('phase3_pf', 'phase_3', 'displacement_pf', None),
+    ('data_scalar', None, None, 'data_scalar'),
+)
+
+def _compile_row_builder(use_test_db):
+    """
+    Generate a function that flattens a reading into an INSERT row
+    
+    The field specs are fixed, so the lookups are emitted as straight-line
+    code once instead of being interpreted for every reading.
+    
+    Parameters:
+    - use_test_db: Include the test metadata and simulated columns
+    
+    Returns:
+    - Function taking a meter data dictionary and returning a row tuple
+    """
+    sections = []
+    for column, section, key, fallback in _READING_FIELDS:
+        if section is not None and section not in sections:
+            sections.append(section)
+    
+    assignments = []
+    # The timestamp stays in epoch seconds; the writer thread converts it
+    exprs = ["get('timestamp', 0)"]
+    if use_test_db:
+        exprs += [f"get({column!r}, {default!r})" for column, default in _TEST_FIELDS]
+    for column, section, key, fallback in _READING_FIELDS:
+        if section is None:
+            exprs.append(f"get({fallback!r}, 0)")
+        elif fallback is None:
+            exprs.append(f"{section}.get({key!r}, 0)")
+        else:
+            assignments.append(f"    {column} = {section}.get({key!r})")
+            exprs.append(f"({column} if {column} is not None else get({fallback!r}, 0))")
+    if use_test_db:
+        exprs.append("(1 if get('simulated', False) else 0)")
+    
+    lines = ["def build_row(data):", "    get = data.get"]
+    lines += [f"    {section} = get({section!r}, {{}})" for section in sections]
+    lines += assignments
+    lines.append("    return (")
+    lines += [f"        {expr}," for expr in exprs]
+    lines.append("    )")
+    
+    namespace = {}
+    exec(compile('\n'.join(lines), f'<row builder {"test" if use_test_db else "production"}>', 'exec'), namespace)
+    return namespace['build_row']
+
+_BUILD_PRODUCTION_ROW = _compile_row_builder(False)
+_BUILD_TEST_ROW = _compile_row_builder(True)
+
 class DatabaseHandler:
     """Handler for storing power meter data in MS Access database"""
     
@@ -31,11 +164,53 @@ class DatabaseHandler:
             self.db_path = CONFIG.get('DATABASE_PATH')
             self.table_name = CONFIG.get('DATABASE_TABLE', 'meter_readings')
         
+        if self.enabled and not _TABLE_NAME_PATTERN.match(str(self.table_name)):
+            logger.error(f"Invalid database table name: {self.table_name!r}")
+            self.enabled = False
+        
         self.connection = None
+        # The _connections entry this handler holds a reference on
+        self._connection_entry = None
+        self._insert_cursor = None
+        self._read_cursor = None
+        self._batch_size = max(1, CONFIG.get('DB_BATCH_SIZE', 12))
+        self._flush_interval = CONFIG.get('DB_FLUSH_INTERVAL', 60)
+        self._queue = queue.Queue(maxsize=CONFIG.get('DB_QUEUE_SIZE', 10000))
+        with _connections_lock:
+            self._lock = _connection_locks.setdefault(self.db_path, threading.Lock())
+        self._writer = None
+        self._stop_event = threading.Event()
+        self._write_ok = True
+        self._queued_count = 0
+        self._read_cache_ttl = CONFIG.get('DB_READ_CACHE_TTL', 1.0)
+        # (rows, limit, time fetched, queued count when fetched)
+        self._read_cache = None
+        self.dropped_readings = 0
+        
+        columns = ['[timestamp]']
+        if self.use_test_db:
+            columns += [column for column, default in _TEST_FIELDS]
+        columns += [field[0] for field in _READING_FIELDS]
+        if self.use_test_db:
+            columns.append('simulated')
+        self._columns = columns
+        self._queryable_columns = frozenset(['id'] + [column.strip('[]') for column in columns])
+        self._build_row = _BUILD_TEST_ROW if self.use_test_db else _BUILD_PRODUCTION_ROW
+        self._insert_sql = _INSERT_SQL.format(
+            table=self.table_name,
+            columns=', '.join(columns),
+            params=', '.join('?' * len(columns))
+        )
+        self._recent_sql = _RECENT_SQL.format(table=self.table_name)
         
         if self.enabled:
             self._ensure_database_exists()
             self._create_table_if_needed()
+        
+        if self.enabled:
+            self._writer = threading.Thread(target=self._writer_loop, name='powermeter-db-writer')
+            self._writer.daemon = True
+            self._writer.start()
     
     def _ensure_database_exists(self):
         """Ensure the database directory and file exist"""
@@ -54,52 +229,124 @@ class DatabaseHandler:
             logger.info(f"{'Test' if self.use_test_db else 'Production'} database will be created at: {self.db_path}")
     
     def _get_connection(self):
-        """Get or create database connection"""
+        """Get the shared connection for this database, connecting if needed"""
+        # Another handler found the shared connection broken and dropped it
+        # from the cache; let go of it and use the replacement
+        if self.connection is not None and _connections.get(self.db_path) is not self._connection_entry:
+            self._reset_connection()
+        
         if self.connection is None:
-            try:
-                # Connection string for MS Access
-                conn_str = (
-                    r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
-                    f'DBQ={self.db_path};'
-                )
-                self.connection = pyodbc.connect(conn_str)
-                logger.info(f"Connected to {'test' if self.use_test_db else 'production'} MS Access database")
-            except Exception as e:
-                logger.error(f"Failed to connect to database: {str(e)}")
-                self.enabled = False
-                return None
+            with _connections_lock:
+                entry = _connections.get(self.db_path)
+                if entry is None:
+                    try:
+                        # Connection string for MS Access
+                        conn_str = (
+                            r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
+                            f'DBQ={self.db_path};'
+                        )
+                        entry = _connections[self.db_path] = [pyodbc.connect(conn_str), 0]
+                        logger.info(f"Connected to {'test' if self.use_test_db else 'production'} MS Access database")
+                    except Exception as e:
+                        logger.error(f"Failed to connect to database: {str(e)}")
+                        return None
+                entry[1] += 1
+                self._connection_entry = entry
+                self.connection = entry[0]
         return self.connection
     
+    def _release_connection(self, discard=False):
+        """
+        Stop using the shared connection, closing it when no handler needs it
+        
+        Parameters:
+        - discard: Drop the connection from the cache even if other handlers
+          use it, so the next call reconnects. Handlers still holding it keep
+          it open until they release it themselves.
+        
+        Returns:
+        - True if the connection was closed
+        """
+        conn = self.connection
+        entry = self._connection_entry
+        self.connection = None
+        self._connection_entry = None
+        if conn is None:
+            return False
+        
+        with _connections_lock:
+            cached = _connections.get(self.db_path) is entry
+            if cached and discard:
+                del _connections[self.db_path]
+                cached = False
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] > 0:
+                    return False
+            if cached:
+                del _connections[self.db_path]
+        
+        try:
+            conn.close()
+        except Exception as e:
+            if not discard:
+                logger.error(f"Error closing connection: {str(e)}")
+        return True
+    
     def _create_table_if_needed(self):
         """Create the meter readings table if it doesn't exist"""
-        conn = self._get_connection()
-        if not conn:
+        # Another handler in this process already checked the schema
+        if (self.db_path, self.table_name) in _schema_ready:
+            return
+        
+        cursor = self._get_read_cursor()
+        if cursor is None:
+            self.enabled = False
             return
             
         try:
-            cursor = conn.cursor()
-            
             # Check if table exists
             tables = cursor.tables(table=self.table_name, tableType='TABLE').fetchall()
             if tables:
                 logger.info(f"Table '{self.table_name}' already exists")
-                return
-            
-            # Create table based on database type
-            if self.use_test_db:
-                create_table_sql = self._get_test_table_schema()
             else:
-                create_table_sql = self._get_production_table_schema()
-            
-            cursor.execute(create_table_sql)
-            conn.commit()
-            logger.info(f"Created {'test' if self.use_test_db else 'production'} table '{self.table_name}'")
+                # Create table based on database type
+                if self.use_test_db:
+                    create_table_sql = self._get_test_table_schema()
+                else:
+                    create_table_sql = self._get_production_table_schema()
+                
+                cursor.execute(create_table_sql)
+                self.connection.commit()
+                logger.info(f"Created {'test' if self.use_test_db else 'production'} table '{self.table_name}'")
             
         except Exception as e:
             logger.error(f"Error creating table: {str(e)}")
             self.enabled = False
-        finally:
-            cursor.close()
+            self._reset_connection()
+            return
+        
+        self._create_timestamp_index_if_needed(cursor)
+        _schema_ready.add((self.db_path, self.table_name))
+    
+    def _create_timestamp_index_if_needed(self, cursor):
+        """
+        Index the timestamp column so recent-readings queries avoid a sort
+        
+        Also adds the index to tables created before it existed.
+        """
+        index_name = f"idx_{self.table_name}_timestamp"
+        try:
+            indexes = {row.index_name for row in cursor.statistics(self.table_name).fetchall()}
+            if index_name in indexes:
+                return
+            
+            cursor.execute(f"CREATE INDEX {index_name} ON {self.table_name} ([timestamp] DESC)")
+            self.connection.commit()
+            logger.info(f"Created index '{index_name}'")
+        except Exception as e:
+            # Queries still work without the index, only slower
+            logger.warning(f"Could not create index '{index_name}': {str(e)}")
     
     def _get_production_table_schema(self):
         """Get the production database table schema (no test-specific columns)"""
@@ -172,120 +419,266 @@ class DatabaseHandler:
         """
     
     def store_reading(self, data):
-        """Store a power meter reading in the database"""
+        """
+        Queue a power meter reading for storage
+        
+        The row is handed to the writer thread, which commits once
+        DB_BATCH_SIZE rows are pending or DB_FLUSH_INTERVAL seconds after the
+        first of them was queued. Call flush() to write a partial batch.
+        The reading is dropped if the queue is full.
+        """
         if not self.enabled:
             return False
-            
-        conn = self._get_connection()
-        if not conn:
+        
+        try:
+            self._queue.put_nowait(self._build_row(data))
+            self._queued_count += 1
+            return True
+        except queue.Full:
+            self.dropped_readings += 1
+            if self.dropped_readings == 1 or self.dropped_readings % 100 == 0:
+                logger.warning(f"Database write queue full, {self.dropped_readings} readings dropped so far")
             return False
-            
+    
+    def flush(self, timeout=5):
+        """
+        Wait for the writer thread to store every queued reading
+        
+        Parameters:
+        - timeout: Seconds to wait for the write
+        
+        Returns:
+        - True if the queued readings were written
+        """
+        if self._writer is None or not self._writer.is_alive():
+            return False
+        
+        done = threading.Event()
         try:
-            cursor = conn.cursor()
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout) and self._write_ok
+    
+    def _writer_loop(self):
+        """Drain the queue into batched inserts until stopped"""
+        running = True
+        while running:
+            rows = []
+            flush_waiters = []
+            deadline = None
             
-            # Prepare the data
-            system_data = data.get('system', {})
-            phase1_data = data.get('phase_1', {})
-            phase2_data = data.get('phase_2', {})
-            phase3_data = data.get('phase_3', {})
+            # Collect rows until the batch is full, the window closes or
+            # someone asks for a flush
+            while running and not flush_waiters and len(rows) < self._batch_size:
+                if deadline is None:
+                    item = self._queue.get()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    flush_waiters.append(item)
+                else:
+                    rows.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + self._flush_interval
             
-            if self.use_test_db:
-                # Test database includes test metadata
-                insert_sql = f"""
-                INSERT INTO {self.table_name} (
-                    [timestamp], test_name, test_type, test_duration, test_status, notes,
-                    power_kw, reactive_power_kvar, apparent_power_kva, energy_kwh, power_factor,
-                    current_avg, voltage_ll_avg, voltage_ln_avg, frequency,
-                    phase1_power_kw, phase1_current, phase1_voltage_ln, phase1_pf,
-                    phase2_power_kw, phase2_current, phase2_voltage_ln, phase2_pf,
-                    phase3_power_kw, phase3_current, phase3_voltage_ln, phase3_pf,
-                    data_scalar, simulated
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
+            try:
+                if rows:
+                    self._write_ok = self._write_with_retry(rows)
+            except Exception as e:
+                # Never let one bad batch stop the writer thread
+                logger.error(f"Unexpected error writing {len(rows)} readings: {str(e)}")
+                self._write_ok = False
+            finally:
+                for waiter in flush_waiters:
+                    waiter.set()
+    
+    def _write_with_retry(self, rows):
+        """
+        Write a batch, reconnecting with exponential backoff on failure
+        
+        Readings keep queueing while the writer waits. The batch is dropped
+        after _MAX_WRITE_ATTEMPTS, or after one attempt once close() has
+        been called.
+        
+        Parameters:
+        - rows: List of row tuples in INSERT column order
+        
+        Returns:
+        - True if the rows were committed
+        """
+        delay = _RETRY_DELAY_MIN
+        for attempt in range(1, _MAX_WRITE_ATTEMPTS + 1):
+            if self._write_rows(rows):
+                if attempt > 1:
+                    logger.info(f"Stored {len(rows)} readings after {attempt} attempts")
+                return True
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, _RETRY_DELAY_MAX)
+        
+        logger.error(f"Dropped {len(rows)} readings after {attempt} failed write attempts")
+        return False
+    
+    def _write_rows(self, rows):
+        """
+        Insert a batch of rows in one transaction
+        
+        Parameters:
+        - rows: List of row tuples in INSERT column order, with the
+          timestamp in epoch seconds
+        
+        Returns:
+        - True if the rows were committed
+        """
+        with self._lock:
+            try:
+                # Bind DATETIME values here, off the sampling thread
+                fromtimestamp = datetime.fromtimestamp
+                rows = [(fromtimestamp(row[0]),) + row[1:] for row in rows]
                 
-                values = (
-                    datetime.fromtimestamp(data.get('timestamp', 0)),
-                    data.get('test_name', 'Unknown Test'),
-                    data.get('test_type', 'simulation'),
-                    data.get('test_duration', 0),
-                    data.get('test_status', 'running'),
-                    data.get('notes', ''),
-                    system_data.get('power_kw') or data.get('power_kw', 0),
-                    system_data.get('reactive_power_kvar') or data.get('reactive_power_kvar', 0),
-                    system_data.get('apparent_power_kva') or data.get('apparent_power_kva', 0),
-                    system_data.get('energy_kwh') or data.get('energy_kwh', 0),
-                    system_data.get('displacement_pf') or data.get('power_factor', 0),
-                    system_data.get('current_avg') or data.get('current_avg', 0),
-                    system_data.get('voltage_ll_avg') or data.get('voltage_ll_avg', 0),
-                    system_data.get('voltage_ln_avg') or data.get('voltage_ln_avg', 0),
-                    data.get('frequency', 0),
-                    phase1_data.get('power_kw', 0),
-                    phase1_data.get('current', 0),
-                    phase1_data.get('voltage_ln', 0),
-                    phase1_data.get('displacement_pf', 0),
-                    phase2_data.get('power_kw', 0),
-                    phase2_data.get('current', 0),
-                    phase2_data.get('voltage_ln', 0),
-                    phase2_data.get('displacement_pf', 0),
-                    phase3_data.get('power_kw', 0),
-                    phase3_data.get('current', 0),
-                    phase3_data.get('voltage_ln', 0),
-                    phase3_data.get('displacement_pf', 0),
-                    data.get('data_scalar', 0),
-                    1 if data.get('simulated', False) else 0
-                )
-            else:
-                # Production database (no test metadata)
-                insert_sql = f"""
-                INSERT INTO {self.table_name} (
-                    [timestamp], power_kw, reactive_power_kvar, apparent_power_kva,
-                    energy_kwh, power_factor, current_avg, voltage_ll_avg, voltage_ln_avg,
-                    frequency, phase1_power_kw, phase1_current, phase1_voltage_ln, phase1_pf,
-                    phase2_power_kw, phase2_current, phase2_voltage_ln, phase2_pf,
-                    phase3_power_kw, phase3_current, phase3_voltage_ln, phase3_pf,
-                    data_scalar
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """
+                cursor = self._get_insert_cursor()
+                if cursor is None:
+                    return False
+                
+                cursor.executemany(self._insert_sql, rows)
+                self.connection.commit()
                 
-                values = (
-                    datetime.fromtimestamp(data.get('timestamp', 0)),
-                    system_data.get('power_kw') or data.get('power_kw', 0),
-                    system_data.get('reactive_power_kvar') or data.get('reactive_power_kvar', 0),
-                    system_data.get('apparent_power_kva') or data.get('apparent_power_kva', 0),
-                    system_data.get('energy_kwh') or data.get('energy_kwh', 0),
-                    system_data.get('displacement_pf') or data.get('power_factor', 0),
-                    system_data.get('current_avg') or data.get('current_avg', 0),
-                    system_data.get('voltage_ll_avg') or data.get('voltage_ll_avg', 0),
-                    system_data.get('voltage_ln_avg') or data.get('voltage_ln_avg', 0),
-                    data.get('frequency', 0),
-                    phase1_data.get('power_kw', 0),
-                    phase1_data.get('current', 0),
-                    phase1_data.get('voltage_ln', 0),
-                    phase1_data.get('displacement_pf', 0),
-                    phase2_data.get('power_kw', 0),
-                    phase2_data.get('current', 0),
-                    phase2_data.get('voltage_ln', 0),
-                    phase2_data.get('displacement_pf', 0),
-                    phase3_data.get('power_kw', 0),
-                    phase3_data.get('current', 0),
-                    phase3_data.get('voltage_ln', 0),
-                    phase3_data.get('displacement_pf', 0),
-                    data.get('data_scalar', 0)
-                )
+                logger.debug(f"Stored {len(rows)} readings in {'test' if self.use_test_db else 'production'} database")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error storing {len(rows)} readings: {str(e)}")
+                # Try to reconnect on next attempt
+                self._reset_connection()
+                return False
+    
+    def _get_insert_cursor(self):
+        """Get the cursor reused for every batched insert"""
+        if self._insert_cursor is None:
+            conn = self._get_connection()
+            if not conn:
+                return None
+            self._insert_cursor = conn.cursor()
+            try:
+                # Bind the whole batch as one parameter array
+                self._insert_cursor.fast_executemany = True
+            except AttributeError:
+                pass
+        return self._insert_cursor
+    
+    def _get_read_cursor(self):
+        """Get the cursor reused for queries"""
+        if self._read_cursor is None:
+            conn = self._get_connection()
+            if not conn:
+                return None
+            self._read_cursor = conn.cursor()
+        return self._read_cursor
+    
+    def _reset_connection(self):
+        """Drop the connection and its cursors so the next call reconnects"""
+        for cursor in (self._insert_cursor, self._read_cursor):
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+        self._insert_cursor = None
+        self._read_cursor = None
+        self._release_connection(discard=True)
+    
+    def bulk_load_readings(self, readings):
+        """
+        Backfill many readings at once through a temporary CSV file
+        
+        The readings bypass the writer queue and are loaded by the database
+        engine in a single INSERT ... SELECT, which is much faster than
+        binding parameters row by row for large backfills.
+        
+        Parameters:
+        - readings: Iterable of meter data dictionaries
+        
+        Returns:
+        - Number of rows loaded, or 0 on error
+        """
+        if not self.enabled:
+            return 0
+        
+        directory = tempfile.mkdtemp(prefix='powermeter_')
+        try:
+            csv_path = os.path.join(directory, 'readings.csv')
+            names = [column.strip('[]') for column in self._columns]
             
-            cursor.execute(insert_sql, values)
-            conn.commit()
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                for data in readings:
+                    row = self._build_row(data)
+                    timestamp = datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M:%S')
+                    writer.writerow((timestamp,) + row[1:])
             
-            logger.debug(f"Stored reading in {'test' if self.use_test_db else 'production'} database")
-            return True
+            # Describe the columns so the text driver does not guess types
+            with open(os.path.join(directory, 'schema.ini'), 'w', encoding='utf-8') as f:
+                f.write('[readings.csv]\nColNameHeader=True\nFormat=CSVDelimited\n')
+                f.write('DateTimeFormat=yyyy-mm-dd hh:nn:ss\n')
+                for index, name in enumerate(names, 1):
+                    f.write(f"Col{index}={name} {_CSV_COLUMN_TYPES.get(name, 'Double')}\n")
             
-        except Exception as e:
-            logger.error(f"Error storing reading: {str(e)}")
-            # Try to reconnect on next attempt
-            self.connection = None
-            return False
+            return self.bulk_load_csv(csv_path)
         finally:
-            cursor.close()
+            shutil.rmtree(directory, ignore_errors=True)
+    
+    def bulk_load_csv(self, path):
+        """
+        Load a CSV file into the table with a single INSERT ... SELECT
+        
+        The file needs a header row naming the table columns, as written by
+        bulk_load_readings().
+        
+        Parameters:
+        - path: Path to the CSV file
+        
+        Returns:
+        - Number of rows loaded, or 0 on error
+        """
+        if not self.enabled:
+            return 0
+        
+        directory, file_name = os.path.split(os.path.abspath(path))
+        sql = _BULK_INSERT_SQL.format(
+            table=self.table_name,
+            columns=', '.join(self._columns),
+            directory=directory,
+            # The text driver expects the extension separator as '#'
+            file=file_name.replace('.', '#')
+        )
+        
+        with self._lock:
+            cursor = self._get_insert_cursor()
+            if cursor is None:
+                return 0
+            
+            try:
+                cursor.execute(sql)
+                loaded = cursor.rowcount
+                self.connection.commit()
+                logger.info(f"Bulk loaded {loaded} readings from {path}")
+                self._read_cache = None
+                return loaded
+            except Exception as e:
+                logger.error(f"Error bulk loading {path}: {str(e)}")
+                self._reset_connection()
+                return 0
     
     def store_test_result(self, test_name, test_type, status, duration=0, notes="", meter_data=None):
         """
@@ -318,50 +711,152 @@ class DatabaseHandler:
         if meter_data:
             test_data.update(meter_data)
         
-        return self.store_reading(test_data)
+        # Test results are infrequent, so write them straight away
+        return self.store_reading(test_data) and self.flush()
     
     def close(self):
-        """Close the database connection"""
-        if self.connection:
+        """Write queued readings, stop the writer thread and close the connection"""
+        if self._writer is not None:
+            self._stop_event.set()
             try:
-                self.connection.close()
+                self._queue.put(None, timeout=5)
+                self._writer.join(timeout=10)
+            except queue.Full:
+                logger.error("Database writer is not draining, queued readings were not written")
+            self._writer = None
+        
+        with self._lock:
+            for cursor in (self._insert_cursor, self._read_cursor):
+                if cursor is not None:
+                    try:
+                        cursor.close()
+                    except Exception as e:
+                        logger.error(f"Error closing cursor: {str(e)}")
+            self._insert_cursor = None
+            self._read_cursor = None
+            
+            if self._release_connection():
                 logger.info(f"Closed {'test' if self.use_test_db else 'production'} database connection")
-            except Exception as e:
-                logger.error(f"Error closing connection: {str(e)}")
-            finally:
-                self.connection = None
     
-    def get_recent_readings(self, limit=100):
-        """Get recent readings from the database"""
+    def get_recent_readings(self, limit=100, columns=None):
+        """
+        Get recent readings from the database
+        
+        Results are reused for DB_READ_CACHE_TTL seconds as long as no new
+        reading has been stored in the meantime. Readings still waiting in
+        the write queue appear once the writer commits their batch; call
+        flush() first if they must be included.
+        
+        Parameters:
+        - limit: Maximum number of readings
+        - columns: Optional list of column names to return instead of all
+        """
+        key = (limit, tuple(columns) if columns else None)
+        select_list = self._select_list(columns)
+        
+        now = time.monotonic()
+        cached = self._read_cache
+        if (cached is not None and cached[1] == key and
+                now - cached[2] < self._read_cache_ttl and cached[3] == self._queued_count):
+            return cached[0]
+        
+        queued_count = self._queued_count
+        rows = list(self._iter_query(limit, select_list))
+        if self.enabled:
+            self._read_cache = (rows, key, now, queued_count)
+        return rows
+    
+    def iter_recent_readings(self, limit=100, columns=None, fetch_size=500):
+        """
+        Yield recent readings, newest first, fetching them in batches
+        
+        The connection stays locked until the generator is exhausted or
+        closed, so consume it promptly.
+        
+        Parameters:
+        - limit: Maximum number of readings
+        - columns: Optional list of column names to return instead of all
+        - fetch_size: Rows fetched from the driver per round trip
+        """
+        return self._iter_query(limit, self._select_list(columns), fetch_size)
+    
+    def get_recent_readings_columnar(self, limit=100, columns=None):
+        """
+        Get recent readings as one list per column, newest first
+        
+        Chart code can use the lists directly, and no dictionary is built
+        per row.
+        
+        Parameters:
+        - limit: Maximum number of readings
+        - columns: Optional list of column names to return instead of all
+        
+        Returns:
+        - Dictionary mapping each column name to its list of values
+        """
+        select_list = self._select_list(columns)
         if not self.enabled:
-            return []
-            
-        conn = self._get_connection()
-        if not conn:
-            return []
-            
-        try:
-            cursor = conn.cursor()
-            
-            query = f"""
-            SELECT TOP {limit} * FROM {self.table_name}
-            ORDER BY timestamp DESC
-            """
-            
-            cursor.execute(query)
-            columns = [column[0] for column in cursor.description]
-            results = []
-            
-            for row in cursor.fetchall():
-                results.append(dict(zip(columns, row)))
-            
-            return results
+            return {}
+        
+        with self._lock:
+            cursor = self._get_read_cursor()
+            if cursor is None:
+                return {}
             
-        except Exception as e:
-            logger.error(f"Error getting recent readings: {str(e)}")
-            return []
-        finally:
-            cursor.close()
+            try:
+                cursor.execute(self._recent_query(limit, select_list))
+                names = [column[0] for column in cursor.description]
+                rows = cursor.fetchall()
+                if not rows:
+                    return {name: [] for name in names}
+                return {name: list(values) for name, values in zip(names, zip(*rows))}
+                
+            except Exception as e:
+                logger.error(f"Error getting recent readings: {str(e)}")
+                self._reset_connection()
+                return {}
+    
+    def _recent_query(self, limit, select_list):
+        """Build the query for the newest readings"""
+        return self._recent_sql.format(limit=int(limit), columns=select_list)
+    
+    def _select_list(self, columns):
+        """
+        Build the SELECT column list, accepting only known column names
+        
+        Raises:
+        - ValueError if a column is not part of the table
+        """
+        if not columns:
+            return '*'
+        unknown = [column for column in columns if column not in self._queryable_columns]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(map(str, unknown))}")
+        return ', '.join(f'[{column}]' for column in columns)
+    
+    def _iter_query(self, limit, select_list, fetch_size=500):
+        """Run the recent readings query and yield each row as a dictionary"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            cursor = self._get_read_cursor()
+            if cursor is None:
+                return
+                
+            try:
+                cursor.execute(self._recent_query(limit, select_list))
+                columns = tuple(column[0] for column in cursor.description)
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(zip(columns, row))
+                
+            except Exception as e:
+                logger.error(f"Error getting recent readings: {str(e)}")
+                self._reset_connection()
 
 
 # Convenience functions for getting database handlers
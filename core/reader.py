@@ -2,6 +2,7 @@
 Power meter reader for communicating with the device and processing data
 """
 import logging
+import struct
 import time
 from modbus.client import ModbusClient
 from modbus.registers import REGISTERS
@@ -9,6 +10,203 @@ from config.settings import CONFIG
 
 logger = logging.getLogger('powermeter.core.reader')
 
+# Decoders for the basic (44001-44022) and detailed (44001-44064) blocks
+_BASIC_BLOCK = struct.Struct('>22H')
+_DETAILED_BLOCK = struct.Struct('>64H')
+
+# Detailed block without the trailing counters (time since reset and the
+# data tick counter, 44062-44064). The per-phase energies are interleaved
+# with instantaneous per-phase values, so they are read with them rather
+# than costing extra Modbus transactions.
+_FAST_DETAILED_BLOCK = struct.Struct('>61H')
+_COUNTER_INDEX = 61
+
+# Scaled fields of the detailed block: (key, register index, multiplier,
+# two-register value). Two-register values are (MSW * 65536 + LSW) with the
+# LSW at the given index.
+_SYSTEM_FIELDS = (
+    ('energy_kwh', 0, 'power', True),
+    ('power_kw', 2, 'power', False),
+    ('demand_kw_max', 3, 'power', False),
+    ('demand_kw_now', 4, 'power', False),
+    ('power_kw_max', 5, 'power', False),
+    ('power_kw_min', 6, 'power', False),
+    ('reactive_energy_kvarh', 7, 'power', True),
+    ('reactive_power_kvar', 9, 'power', False),
+    ('apparent_energy_kvah', 10, 'power', True),
+    ('apparent_power_kva', 12, 'power', False),
+    ('displacement_pf', 13, 'pf', False),
+    ('apparent_pf', 14, 'pf', False),
+    ('current_avg', 15, 'current', False),
+    ('voltage_ll_avg', 16, 'voltage', False),
+    ('voltage_ln_avg', 17, 'voltage', False)
+)
+
+_VOLTAGE_FIELDS = (
+    ('l1_l2', 18, 'voltage', False),
+    ('l2_l3', 19, 'voltage', False),
+    ('l1_l3', 20, 'voltage', False)
+)
+
+# Per-phase fields: (key, multiplier, two-register value), in the same order
+# as the offsets in _PHASE_REGISTERS
+_PHASE_FIELDS = (
+    ('energy_kwh', 'power', True),
+    ('power_kw', 'power', False),
+    ('reactive_energy_kvarh', 'power', True),
+    ('reactive_power_kvar', 'power', False),
+    ('apparent_energy_kvah', 'power', True),
+    ('apparent_power_kva', 'power', False),
+    ('displacement_pf', 'pf', False),
+    ('apparent_pf', 'pf', False),
+    ('current', 'current', False),
+    ('voltage_ln', 'voltage', False)
+)
+
+_PHASE_REGISTERS = (
+    ('phase_1', (22, 28, 31, 37, 40, 46, 49, 52, 55, 58)),
+    ('phase_2', (24, 29, 33, 38, 42, 47, 50, 53, 56, 59)),
+    ('phase_3', (26, 30, 35, 39, 44, 48, 51, 54, 57, 60)),
+)
+
+# Raw register values kept alongside the scaled ones
+_RAW_FIELDS = (
+    ('frequency', 21),
+    ('voltage_ll_avg', 16),
+    ('voltage_ln_avg', 17),
+    ('current_avg', 15),
+    ('power', 2),
+    ('pf', 13)
+)
+
+# Unrealistic value limits: (group, field, limit, divisor). Values above the
+# limit are divided by the divisor.
+_VALUE_LIMITS = (
+    ('system', 'power_kw', 10000, 10),           # Over 10000 kW
+    ('system', 'energy_kwh', 1000000000, 100),   # Over 1 billion kWh
+    ('phase_1', 'power_kw', 5000, 10),           # Over 5000 kW for a phase
+    ('phase_1', 'energy_kwh', 1000000000, 100),
+    ('phase_2', 'power_kw', 5000, 10),
+    ('phase_2', 'energy_kwh', 1000000000, 100),
+    ('phase_3', 'power_kw', 5000, 10),
+    ('phase_3', 'energy_kwh', 1000000000, 100)
+)
+
+# Multipliers used when the scalar value is not recognised
+_DEFAULT_MULTIPLIERS = {
+    'power': 1.0,     # kW, kWh, kVA, kVAh, kVAR, kVARh
+    'pf': 0.01,       # Power factor
+    'current': 1.0,   # Amps
+    'voltage': 1.0,   # Volts
+    'frequency': 0.01 # Frequency (Hz)
+}
+
+# Multipliers for each scalar value, based exactly on the scalar value table
+# D-1. Frequency uses 0.005 throughout, which gives ~60Hz. Scalar 15 is a
+# special case based on observed data. The dictionaries are shared by every
+# reading, so treat them as read-only.
+_SCALAR_MULTIPLIERS = {
+    0: {'power': 0.00001, 'pf': 0.01, 'current': 0.01, 'voltage': 0.1, 'frequency': 0.005},
+    1: {'power': 0.001, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1, 'frequency': 0.005},
+    2: {'power': 0.01, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1, 'frequency': 0.005},
+    3: {'power': 0.1, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1, 'frequency': 0.005},
+    4: {'power': 1.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0, 'frequency': 0.005},
+    5: {'power': 10.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0, 'frequency': 0.005},
+    6: {'power': 100.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0, 'frequency': 0.005},
+    15: {'power': 0.1, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1, 'frequency': 0.005}
+}
+
+def _repair_frequency(frequency, raw_freq):
+    """
+    Fix a frequency outside the typical 45-65 Hz range
+    
+    Parameters:
+    - frequency: Scaled frequency
+    - raw_freq: Raw frequency register value
+    
+    Returns:
+    - Frequency with a plausible multiplier applied, or unchanged
+    """
+    # Try different multipliers to get a plausible value
+    if 550 < raw_freq < 650:
+        return raw_freq / 10  # Might be around 60 Hz
+    elif 5500 < raw_freq < 6500:
+        return raw_freq / 100  # Might be around 60 Hz
+    elif raw_freq > 10000:
+        return raw_freq / 200  # For very large values
+    return frequency
+
+def _compile_detailed_builder(data_scalar, multipliers):
+    """
+    Generate a function that turns a detailed register block into a reading
+    
+    The multipliers are fixed for a given scalar, so they are emitted as
+    constants in straight-line code instead of being looked up per field.
+    The unrealistic-value limits and the frequency repair are applied while
+    scaling, so the reading needs no separate filter pass.
+    
+    Parameters:
+    - data_scalar: Scalar value the multipliers belong to
+    - multipliers: Dictionary of multipliers for that scalar
+    
+    Returns:
+    - Function taking the register tuple and a timestamp and returning the
+      filtered reading dictionary
+    """
+    limits = {(group, field): (limit, divisor) for group, field, limit, divisor in _VALUE_LIMITS}
+    checks = []
+    
+    def scaled(group, key, index, multiplier, pair):
+        value = f"((r[{index + 1}] << 16) | r[{index}])" if pair else f"r[{index}]"
+        value = f"{value} * {multipliers[multiplier]!r}"
+        if (group, key) in limits:
+            # Range-checked values are computed up front into a local
+            limit, divisor = limits[(group, key)]
+            name = f"{group}_{key}"
+            checks.append(f"    {name} = {value}")
+            checks.append(f"    if {name} > {limit!r}:")
+            checks.append(f"        {name} = {name} / {divisor!r}")
+            value = name
+        return f"            {key!r}: {value},"
+    
+    body = [
+        "    return {",
+        "        'timestamp': timestamp,",
+        f"        'data_scalar': {data_scalar!r},",
+        "        'multipliers': multipliers,",
+        "        'system': {"
+    ]
+    body += [scaled('system', *field) for field in _SYSTEM_FIELDS]
+    body += ["        },", "        'voltages': {"]
+    body += [scaled('voltages', *field) for field in _VOLTAGE_FIELDS]
+    body += ["        },", "        'frequency': frequency,", "        'raw_values': {"]
+    body += [f"            {key!r}: r[{index}]," for key, index in _RAW_FIELDS]
+    body.append(f"            'data_scalar': {data_scalar!r},")
+    body.append("        },")
+    for phase, offsets in _PHASE_REGISTERS:
+        body.append(f"        {phase!r}: {{")
+        body += [scaled(phase, key, index, multiplier, pair)
+                 for (key, multiplier, pair), index in zip(_PHASE_FIELDS, offsets)]
+        body.append("        },")
+    body += [
+        "        'time_since_reset': (r[62] << 16) | r[61],",
+        "        'data_tick_counter': r[63],",
+        "    }"
+    ]
+    
+    lines = ["def build_detailed(r, timestamp):"]
+    lines += checks
+    lines += [
+        f"    frequency = r[21] * {multipliers['frequency']!r}",
+        "    if frequency < 45 or frequency > 65:",
+        "        frequency = repair_frequency(frequency, r[21])"
+    ]
+    lines += body
+    
+    namespace = {'multipliers': multipliers, 'repair_frequency': _repair_frequency}
+    exec(compile('\n'.join(lines), f'<detailed builder scalar {data_scalar}>', 'exec'), namespace)
+    return namespace['build_detailed']
+
 class PowerMeterReader:
     """Reader for communicating with power meters and processing data"""
     
@@ -26,10 +224,43 @@ class PowerMeterReader:
         self.timeout = timeout
         self.modbus_client = ModbusClient(port, baud_rate, CONFIG.get('MODBUS_ADDRESS', 1), timeout)
         self.data_scalar = None
+        # True once data_scalar has been read from the meter rather than
+        # taken from DEFAULT_SCALAR
+        self._scalar_from_meter = False
+        self._default_scalar = CONFIG.get('DEFAULT_SCALAR', 4)
+        self._scalar_register = REGISTERS['DATA_SCALAR']
+        
+        # Manual scaling overrides replace the scalar table entirely
+        if CONFIG.get('OVERRIDE_SCALING', False):
+            # Missing factors fall back to the default multipliers
+            self._override_multipliers = {**_DEFAULT_MULTIPLIERS, **CONFIG.get('SCALING_FACTORS', {})}
+            logger.info(f"Using manual scaling overrides from config: {self._override_multipliers}")
+        else:
+            self._override_multipliers = None
+        
+        # The counters (44062-44064) are refreshed on the slow schedule;
+        # between refreshes the rest of the detailed block is read. Polls
+        # are deadline scheduled, so a refresh is due half a poll early to
+        # absorb wake-up jitter. An interval of 0 reads them every poll.
+        self._slow_interval = CONFIG.get('SLOW_POLL_INTERVAL', 0)
+        self._slow_due_after = self._slow_interval - CONFIG.get('POLL_INTERVAL', 0) / 2
+        self._slow_registers = None
+        self._slow_read_at = 0.0
+        
+        # Generated detailed-reading builders, by scalar value
+        self._detailed_builders = {}
+        
+        # Last scalar resolved by _get_scalar_multipliers and its table
+        self._resolved_scalar = None
+        self._resolved_multipliers = None
         
     def connect(self):
-        """Connect to the power meter"""
-        return self.modbus_client.connect()
+        """Connect to the power meter and read its data scalar"""
+        connected = self.modbus_client.connect()
+        if connected:
+            self._slow_registers = None
+            self._prime_scalar()
+        return connected
         
     def disconnect(self):
         """Disconnect from the power meter"""
@@ -63,6 +294,37 @@ class PowerMeterReader:
         """
         return self.modbus_client.read_registers(register_address, register_count)
         
+    def _read_block(self, register_address, block, with_scalar=False):
+        """
+        Read a fixed-size register block and decode it in one call
+        
+        Parameters:
+        - register_address: Starting register address
+        - block: struct.Struct describing the block
+        - with_scalar: Also read the data scalar in the same exchange
+        
+        Returns:
+        - Tuple of register values or None if error
+        """
+        if with_scalar:
+            payload, scalar_payload = self.modbus_client.read_many(
+                [(register_address, block.size // 2), (self._scalar_register, 1)],
+                raw=True
+            )
+            if scalar_payload is not None and len(scalar_payload) >= 2:
+                self.data_scalar = (scalar_payload[0] << 8) | scalar_payload[1]
+                self._scalar_from_meter = True
+                logger.info(f"Read data scalar value: {self.data_scalar}")
+            else:
+                self.data_scalar = self._default_scalar
+                self._scalar_from_meter = False
+                logger.warning(f"Using default scalar value: {self.data_scalar}")
+        else:
+            payload = self.modbus_client.read_registers_raw(register_address, block.size // 2)
+        if payload is None or len(payload) < block.size:
+            return None
+        return block.unpack_from(payload)
+        
     def read_data_scalar(self):
         """
         Read the data scalar value from register 44602
@@ -70,13 +332,27 @@ class PowerMeterReader:
         Returns:
         - Scalar value or None if error
         """
-        scalar = self.read_register(REGISTERS['DATA_SCALAR'])
+        scalar = self.read_register(self._scalar_register)
         if scalar is not None:
             logger.info(f"Read data scalar value: {scalar}")
             self.data_scalar = scalar
+            self._scalar_from_meter = True
             return scalar
         return None
         
+    def _prime_scalar(self):
+        """
+        Read the data scalar once, falling back to the configured default
+        
+        Returns:
+        - Scalar value in use
+        """
+        if self.read_data_scalar() is None:
+            self.data_scalar = self._default_scalar
+            self._scalar_from_meter = False
+            logger.warning(f"Using default scalar value: {self.data_scalar}")
+        return self.data_scalar
+        
     def _get_scalar_multipliers(self, scalar_value):
         """
         Get scaling multipliers based on the scalar value
@@ -88,107 +364,55 @@ class PowerMeterReader:
         - Dictionary of multipliers for different measurement types
         """
         # Check if scaling override is enabled in config
-        if CONFIG.get('OVERRIDE_SCALING', False):
-            # Use the scaling factors from config
-            multipliers = CONFIG.get('SCALING_FACTORS', {})
-            logger.info(f"Using manual scaling overrides from config: {multipliers}")
-            return multipliers
-            
-        # Default multipliers in case we can't determine scalar
-        multipliers = {
-            'power': 1.0,     # kW, kWh, kVA, kVAh, kVAR, kVARh
-            'pf': 0.01,       # Power factor
-            'current': 1.0,   # Amps
-            'voltage': 1.0,   # Volts
-            'frequency': 0.01 # Frequency (Hz)
-        }
-        
-        # Define multipliers based exactly on the scalar value table D-1
-        scalar_map = {
-            0: {'power': 0.00001, 'pf': 0.01, 'current': 0.01, 'voltage': 0.1},
-            1: {'power': 0.001, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1},
-            2: {'power': 0.01, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1},
-            3: {'power': 0.1, 'pf': 0.01, 'current': 0.1, 'voltage': 0.1},
-            4: {'power': 1.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0},
-            5: {'power': 10.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0},
-            6: {'power': 100.0, 'pf': 0.01, 'current': 1.0, 'voltage': 1.0}
-        }
+        if self._override_multipliers is not None:
+            return self._override_multipliers
         
-        # Special case for scalar 15 (based on observed data)
-        if scalar_value == 15:
-            multipliers = {
-                'power': 0.1,     # Scaling for power
-                'pf': 0.01,       # Power factor scaling
-                'current': 0.1,   # Current scaling
-                'voltage': 0.1,   # Voltage scaling
-                'frequency': 0.005 # Frequency scaling
-            }
-            logger.info(f"Using special multipliers for scalar value 15: {multipliers}")
-            return multipliers
+        # The scalar rarely changes, so reuse the last resolved table
+        if scalar_value == self._resolved_scalar:
+            return self._resolved_multipliers
         
         # For values ≥6 that aren't special cases, use scalar 6 values
-        if scalar_value >= 6 and scalar_value != 15:
-            scalar_value = 6
-            
-        # Get the multipliers for the provided scalar value
-        if scalar_value in scalar_map:
-            multipliers = scalar_map[scalar_value]
-            # Make sure frequency uses a multiplier that gives ~60Hz
-            multipliers['frequency'] = 0.005
-            # logger.info(f"Using scalar value {scalar_value} with multipliers: {multipliers}")
-        else:
+        lookup_value = scalar_value
+        if lookup_value >= 6 and lookup_value != 15:
+            lookup_value = 6
+        
+        multipliers = _SCALAR_MULTIPLIERS.get(lookup_value)
+        if multipliers is None:
             logger.warning(f"Unknown scalar value: {scalar_value}, using default multipliers")
+            multipliers = _DEFAULT_MULTIPLIERS
         
+        self._resolved_scalar = scalar_value
+        self._resolved_multipliers = multipliers
         return multipliers
         
     def _filter_unrealistic_values(self, data):
         """
         Filter out unrealistic values from the data
         
+        The dictionary is modified in place; callers pass a freshly built
+        reading.
+        
         Parameters:
         - data: Dictionary of power meter data
         
         Returns:
-        - Filtered data dictionary
+        - The same dictionary, filtered
         """
-        # Copy the data to avoid modifying the original
-        filtered_data = data.copy()
-        
-        # Check and fix system values
-        if 'system' in filtered_data:
-            sys = filtered_data['system']
-            
-            # Fix unrealistically high power values (over 10000 kW)
-            if sys.get('power_kw', 0) > 10000:
-                sys['power_kw'] = sys.get('power_kw', 0) / 10
-                
-            # Fix unrealistically high energy values (over 1 billion kWh)
-            if sys.get('energy_kwh', 0) > 1000000000:
-                sys['energy_kwh'] = sys.get('energy_kwh', 0) / 100
-        
-        # Fix phase readings
-        for phase in ['phase_1', 'phase_2', 'phase_3']:
-            if phase in filtered_data:
-                # Fix unrealistically high power values (over 5000 kW for a phase)
-                if filtered_data[phase].get('power_kw', 0) > 5000:
-                    filtered_data[phase]['power_kw'] = filtered_data[phase].get('power_kw', 0) / 10
-                
-                # Fix unrealistically high energy values
-                if filtered_data[phase].get('energy_kwh', 0) > 1000000000:
-                    filtered_data[phase]['energy_kwh'] = filtered_data[phase].get('energy_kwh', 0) / 100
+        # Divide unrealistically high values back into range
+        for group, field, limit, divisor in _VALUE_LIMITS:
+            values = data.get(group)
+            if values is not None:
+                value = values.get(field, 0)
+                if value > limit:
+                    values[field] = value / divisor
         
         # Fix frequency if it's clearly wrong (typical range 45-65 Hz)
-        if 'frequency' in filtered_data and (filtered_data['frequency'] < 45 or filtered_data['frequency'] > 65):
-            raw_freq = filtered_data.get('raw_values', {}).get('frequency', 0)
-            # Try different multipliers to get a plausible value
-            if 550 < raw_freq < 650:
-                filtered_data['frequency'] = raw_freq / 10  # Might be around 60 Hz
-            elif 5500 < raw_freq < 6500:
-                filtered_data['frequency'] = raw_freq / 100  # Might be around 60 Hz
-            elif raw_freq > 10000:
-                filtered_data['frequency'] = raw_freq / 200  # For very large values
-        
-        return filtered_data
+        frequency = data.get('frequency')
+        if frequency is not None and (frequency < 45 or frequency > 65):
+            raw_freq = data.get('raw_values', {}).get('frequency', 0)
+            data['frequency'] = _repair_frequency(frequency, raw_freq)
+        
+        return data
         
     def read_basic_data(self):
         """
@@ -197,73 +421,63 @@ class PowerMeterReader:
         Returns:
         - Dictionary of basic power meter data
         """
-        try:
-            # Make sure we have the data scalar
-            if self.data_scalar is None:
-                self.data_scalar = self.read_data_scalar()
-                
-            # If we still don't have it, use the default
-            if self.data_scalar is None:
-                self.data_scalar = CONFIG.get('DEFAULT_SCALAR', 4)
-                logger.warning(f"Using default scalar value: {self.data_scalar}")
-                
-            # Get scaling multipliers
-            multipliers = self._get_scalar_multipliers(self.data_scalar)
-            
-            # Read basic registers
-            registers = self.read_registers(44001, 22)
-            
-            if not registers or len(registers) < 22:
-                logger.warning("Failed to read basic registers")
-                return None
-                
-            # Extract and scale values
-            energy_lsw = registers[0]
-            energy_msw = registers[1]
-            energy = ((energy_msw << 16) | energy_lsw) * multipliers['power']
+        # The scalar is normally read once on connect
+        if self.data_scalar is None:
+            self._prime_scalar()
             
-            power = registers[2] * multipliers['power']
-            reactive_power = registers[9] * multipliers['power']
-            apparent_power = registers[12] * multipliers['power']
-            pf = registers[13] * multipliers['pf']
-            current = registers[15] * multipliers['current']
-            voltage_ll = registers[16] * multipliers['voltage']
-            voltage_ln = registers[17] * multipliers['voltage']
-            frequency = registers[21] * multipliers['frequency']
-            
-            # Create result dictionary
-            data = {
-                'timestamp': time.time(),
-                'energy_kwh': energy,
-                'power_kw': power,
-                'reactive_power_kvar': reactive_power,
-                'apparent_power_kva': apparent_power,
-                'power_factor': pf,
-                'current_avg': current,
-                'voltage_ll_avg': voltage_ll,
-                'voltage_ln_avg': voltage_ln,
-                'frequency': frequency,
-                'data_scalar': self.data_scalar,
-                'raw_values': {
-                    'frequency': registers[21],
-                    'voltage_ll': registers[16],
-                    'voltage_ln': registers[17],
-                    'current': registers[15],
-                    'power': registers[2],
-                    'pf': registers[13]
-                },
-                'multipliers': multipliers
-            }
-            
-            # Filter out unrealistic values
-            filtered_data = self._filter_unrealistic_values(data)
-            
-            return filtered_data
-            
-        except Exception as e:
-            logger.error(f"Error reading basic data: {str(e)}")
+        # Get scaling multipliers
+        multipliers = self._get_scalar_multipliers(self.data_scalar)
+        
+        # Read basic registers
+        registers = self._read_block(44001, _BASIC_BLOCK)
+        
+        if registers is None:
+            logger.warning("Failed to read basic registers")
             return None
             
+        # Extract and scale values
+        power_mult = multipliers['power']
+        voltage_mult = multipliers['voltage']
+        energy_lsw = registers[0]
+        energy_msw = registers[1]
+        energy = ((energy_msw << 16) | energy_lsw) * power_mult
+        
+        power = registers[2] * power_mult
+        reactive_power = registers[9] * power_mult
+        apparent_power = registers[12] * power_mult
+        pf = registers[13] * multipliers['pf']
+        current = registers[15] * multipliers['current']
+        voltage_ll = registers[16] * voltage_mult
+        voltage_ln = registers[17] * voltage_mult
+        frequency = registers[21] * multipliers['frequency']
+        
+        # Create result dictionary
+        data = {
+            'timestamp': time.time(),
+            'energy_kwh': energy,
+            'power_kw': power,
+            'reactive_power_kvar': reactive_power,
+            'apparent_power_kva': apparent_power,
+            'power_factor': pf,
+            'current_avg': current,
+            'voltage_ll_avg': voltage_ll,
+            'voltage_ln_avg': voltage_ln,
+            'frequency': frequency,
+            'data_scalar': self.data_scalar,
+            'raw_values': {
+                'frequency': registers[21],
+                'voltage_ll': registers[16],
+                'voltage_ln': registers[17],
+                'current': registers[15],
+                'power': registers[2],
+                'pf': registers[13]
+            },
+            'multipliers': multipliers
+        }
+        
+        # Filter out unrealistic values
+        return self._filter_unrealistic_values(data)
+            
     def read_detailed_data(self):
         """
         Read detailed power meter data including per-phase information
@@ -271,116 +485,35 @@ class PowerMeterReader:
         Returns:
         - Dictionary of detailed power meter data
         """
-        try:
-            # Make sure we have the data scalar
-            if self.data_scalar is None:
-                self.data_scalar = self.read_data_scalar()
-                
-            # If we still don't have it, use the default
-            if self.data_scalar is None:
-                self.data_scalar = CONFIG.get('DEFAULT_SCALAR', 4)
-                logger.warning(f"Using default scalar value: {self.data_scalar}")
-                
-            # Get scaling multipliers
-            multipliers = self._get_scalar_multipliers(self.data_scalar)
-            
-            # Read a larger block of registers
-            registers = self.read_registers(44001, 64)
-            
-            if not registers or len(registers) < 64:
-                logger.warning("Failed to read detailed registers")
-                return None
-                
-            # Build a comprehensive data structure
-            data = {
-                'timestamp': time.time(),
-                'data_scalar': self.data_scalar,
-                'multipliers': multipliers,
-                'system': {
-                    # For two-register values: (MSW * 65536 + LSW) * scalar_value
-                    'energy_kwh': ((registers[1] << 16) | registers[0]) * multipliers['power'],
-                    # For single-register values: register_value * scalar_value
-                    'power_kw': registers[2] * multipliers['power'],
-                    'demand_kw_max': registers[3] * multipliers['power'],
-                    'demand_kw_now': registers[4] * multipliers['power'],
-                    'power_kw_max': registers[5] * multipliers['power'],
-                    'power_kw_min': registers[6] * multipliers['power'],
-                    # Another two-register value
-                    'reactive_energy_kvarh': ((registers[8] << 16) | registers[7]) * multipliers['power'],
-                    'reactive_power_kvar': registers[9] * multipliers['power'],
-                    # Another two-register value
-                    'apparent_energy_kvah': ((registers[11] << 16) | registers[10]) * multipliers['power'],
-                    'apparent_power_kva': registers[12] * multipliers['power'],
-                    'displacement_pf': registers[13] * multipliers['pf'],
-                    'apparent_pf': registers[14] * multipliers['pf'],
-                    'current_avg': registers[15] * multipliers['current'],
-                    'voltage_ll_avg': registers[16] * multipliers['voltage'],
-                    'voltage_ln_avg': registers[17] * multipliers['voltage']
-                },
-                'voltages': {
-                    'l1_l2': registers[18] * multipliers['voltage'],
-                    'l2_l3': registers[19] * multipliers['voltage'],
-                    'l1_l3': registers[20] * multipliers['voltage']
-                },
-                'frequency': registers[21] * multipliers['frequency'],
-                'raw_values': {
-                    'frequency': registers[21],
-                    'voltage_ll_avg': registers[16],
-                    'voltage_ln_avg': registers[17],
-                    'current_avg': registers[15],
-                    'power': registers[2],
-                    'pf': registers[13],
-                    'data_scalar': self.data_scalar
-                },
-                'phase_1': {
-                    'energy_kwh': ((registers[23] << 16) | registers[22]) * multipliers['power'],
-                    'power_kw': registers[28] * multipliers['power'],
-                    'reactive_energy_kvarh': ((registers[32] << 16) | registers[31]) * multipliers['power'],
-                    'reactive_power_kvar': registers[37] * multipliers['power'],
-                    'apparent_energy_kvah': ((registers[41] << 16) | registers[40]) * multipliers['power'],
-                    'apparent_power_kva': registers[46] * multipliers['power'],
-                    'displacement_pf': registers[49] * multipliers['pf'],
-                    'apparent_pf': registers[52] * multipliers['pf'],
-                    'current': registers[55] * multipliers['current'],
-                    'voltage_ln': registers[58] * multipliers['voltage']
-                },
-                'phase_2': {
-                    'energy_kwh': ((registers[25] << 16) | registers[24]) * multipliers['power'],
-                    'power_kw': registers[29] * multipliers['power'],
-                    'reactive_energy_kvarh': ((registers[34] << 16) | registers[33]) * multipliers['power'],
-                    'reactive_power_kvar': registers[38] * multipliers['power'],
-                    'apparent_energy_kvah': ((registers[43] << 16) | registers[42]) * multipliers['power'],
-                    'apparent_power_kva': registers[47] * multipliers['power'],
-                    'displacement_pf': registers[50] * multipliers['pf'],
-                    'apparent_pf': registers[53] * multipliers['pf'],
-                    'current': registers[56] * multipliers['current'],
-                    'voltage_ln': registers[59] * multipliers['voltage']
-                },
-                'phase_3': {
-                    'energy_kwh': ((registers[27] << 16) | registers[26]) * multipliers['power'],
-                    # Fix for phase 3 power - divide by 10 if it's abnormally high
-                    'power_kw': registers[30] * multipliers['power'] if registers[30] < 100000 else registers[30] * multipliers['power'] / 10,
-                    'reactive_energy_kvarh': ((registers[36] << 16) | registers[35]) * multipliers['power'],
-                    'reactive_power_kvar': registers[39] * multipliers['power'],
-                    'apparent_energy_kvah': ((registers[45] << 16) | registers[44]) * multipliers['power'],
-                    'apparent_power_kva': registers[48] * multipliers['power'],
-                    'displacement_pf': registers[51] * multipliers['pf'],
-                    'apparent_pf': registers[54] * multipliers['pf'],
-                    'current': registers[57] * multipliers['current'],
-                    'voltage_ln': registers[60] * multipliers['voltage']
-                },
-                'time_since_reset': (registers[62] << 16) | registers[61],
-                'data_tick_counter': registers[63]
-            }
-            
-            # Filter out unrealistic values
-            filtered_data = self._filter_unrealistic_values(data)
-            
-            return filtered_data
-            
-        except Exception as e:
-            logger.error(f"Error reading detailed data: {str(e)}")
+        # Read the whole block when the counters are due, otherwise stop
+        # short of them and reuse the last counter values. The scalar is
+        # normally read once on connect; if it is missing, it is fetched
+        # together with the full block.
+        now = time.monotonic()
+        need_scalar = self.data_scalar is None
+        if (need_scalar or self._slow_interval <= 0 or self._slow_registers is None
+                or now - self._slow_read_at >= self._slow_due_after):
+            registers = self._read_block(44001, _DETAILED_BLOCK, with_scalar=need_scalar)
+            if registers is not None and self._slow_interval > 0:
+                self._slow_registers = registers[_COUNTER_INDEX:]
+                self._slow_read_at = now
+        else:
+            registers = self._read_block(44001, _FAST_DETAILED_BLOCK)
+            if registers is not None:
+                registers += self._slow_registers
+        
+        if registers is None:
+            logger.warning("Failed to read detailed registers")
             return None
+        
+        # Build the reading with code specialized for the current scalar;
+        # the builder also filters out unrealistic values
+        builder = self._detailed_builders.get(self.data_scalar)
+        if builder is None:
+            multipliers = self._get_scalar_multipliers(self.data_scalar)
+            builder = _compile_detailed_builder(self.data_scalar, multipliers)
+            self._detailed_builders[self.data_scalar] = builder
+        return builder(registers, time.time())
             
     def test_connection(self):
         """
@@ -390,17 +523,20 @@ class PowerMeterReader:
         - True if connected, False otherwise
         """
         try:
-            # Try to read the data scalar register
-            scalar = self.read_register(REGISTERS['DATA_SCALAR'])
-            if scalar is not None:
-                self.data_scalar = scalar
-                logger.info(f"Connection test successful. Data scalar: {scalar}")
-                return True
+            # The scalar only needs reading if it hasn't come from the meter
+            # yet; otherwise the tick counter is enough to confirm the link
+            if not self._scalar_from_meter:
+                scalar = self.read_register(self._scalar_register)
+                if scalar is not None:
+                    self.data_scalar = scalar
+                    self._scalar_from_meter = True
+                    logger.info(f"Connection test successful. Data scalar: {scalar}")
+                    return True
                 
-            # Try reading another register as fallback
+            # Read the tick counter as a lightweight liveness check
             tick = self.read_register(44064)  # Data Tick Counter
             if tick is not None:
-                logger.info(f"Connection test successful using fallback register. Value: {tick}")
+                logger.info(f"Connection test successful using tick counter. Value: {tick}")
                 return True
                 
             logger.warning("Connection test failed - couldn't read registers")
@@ -2,12 +2,47 @@
 Power meter simulator for testing without hardware
 """
 import random
+import threading
 import time
 import logging
 import math
+from config.settings import CONFIG
 
 logger = logging.getLogger('powermeter.core.simulator')
 
+# Multipliers reported with every simulated reading (scalar 3). The
+# dictionary is shared by every reading, so treat it as read-only; it stays
+# a plain dict so readings serialize directly.
+_MULTIPLIERS = {
+    'power': 0.1,
+    'current': 0.1,
+    'voltage': 0.1,
+    'pf': 0.01,
+    'frequency': 0.005
+}
+
+# Registers that always read the same value
+_FIXED_REGISTERS = {
+    44602: 3,     # Data Scalar (default scalar value)
+    44022: 6000   # Frequency (60.00 Hz with scalar 3 multiplier)
+}
+
+# Ratio of line-line to line-neutral voltage
+_SQRT3 = math.sqrt(3)
+
+# Fixed simulated power factor, and reactive power per kW at that factor
+_SIMULATED_PF = 0.99
+_TAN_PHI = math.tan(math.acos(_SIMULATED_PF))
+
+# Scaling used to derive raw register values when the config has none
+_DEFAULT_SCALING = {
+    'power': 0.1,
+    'current': 0.1,
+    'voltage': 0.1,
+    'pf': 0.01,
+    'frequency': 0.005
+}
+
 class PowerMeterSimulator:
     """Simulator that generates fake power meter data for testing"""
     
@@ -15,9 +50,20 @@ class PowerMeterSimulator:
         """Initialize the simulator"""
         self.connected = False
         self._energy_kwh = 1000000  # Starting energy value
-        self._last_timestamp = time.time()
+        self._last_timestamp = time.monotonic()  # For energy integration
         self.device_address = 1  # Default Modbus device address
         
+        # Configuration is fixed for the life of the simulator
+        self._scaling = CONFIG.get('SCALING_FACTORS', _DEFAULT_SCALING)
+        self._detailed = CONFIG.get('DETAILED_DATA', False)
+        
+        # Reads arriving within the TTL (e.g. concurrent API requests) share
+        # one set of simulated values
+        self._values_ttl = CONFIG.get('SIMULATOR_CACHE_TTL', 0.1)
+        self._values = None
+        self._values_expire = 0.0
+        self._values_lock = threading.Lock()
+        
     def connect(self):
         """Simulate connecting to a power meter"""
         self.connected = True
@@ -40,11 +86,10 @@ class PowerMeterSimulator:
         - Simulated register value
         """
         # Generate appropriate values for common registers
-        if register_address == 44602:  # Data Scalar
-            return 3  # Default scalar value
-        elif register_address == 44022:  # Frequency
-            return 6000  # 60.00 Hz with scalar 3 multiplier
-        elif register_address >= 44001 and register_address <= 44020:
+        value = _FIXED_REGISTERS.get(register_address)
+        if value is not None:
+            return value
+        elif 44001 <= register_address <= 44020:
             return random.randint(1000, 9000)  # Random value for most registers
         else:
             return random.randint(0, 65535)  # Random value for unknown registers
@@ -60,7 +105,19 @@ class PowerMeterSimulator:
         Returns:
         - List of simulated register values
         """
-        return [self.read_register(register_address + i) for i in range(register_count)]
+        # Same values as read_register, without a method call per register
+        randrange = random.randrange
+        fixed = _FIXED_REGISTERS.get
+        values = []
+        for address in range(register_address, register_address + register_count):
+            value = fixed(address)
+            if value is not None:
+                values.append(value)
+            elif 44001 <= address <= 44020:
+                values.append(randrange(1000, 9001))
+            else:
+                values.append(randrange(0, 65536))
+        return values
     
     def read_data_scalar(self):
         """
@@ -73,25 +130,34 @@ class PowerMeterSimulator:
     
     def _get_simulated_values(self):
         """
-        Generate a set of realistic simulated values
+        Get the current simulated values, generating new ones once the
+        previous set is older than SIMULATOR_CACHE_TTL
         
         Returns:
         - Dictionary of simulated values
         """
-        from config.settings import CONFIG
+        with self._values_lock:
+            if self._values is None or time.monotonic() >= self._values_expire:
+                self._values = self._generate_simulated_values()
+                self._values_expire = time.monotonic() + self._values_ttl
+            return self._values
+    
+    def _generate_simulated_values(self):
+        """
+        Generate a set of realistic simulated values
         
-        # Get current timestamp
-        current_time = time.time()
+        Returns:
+        - Dictionary of simulated values
+        """
+        # Energy is integrated over the monotonic clock so wall-clock
+        # adjustments can't make it jump or run backwards
+        current_time = time.monotonic()
         
         # Generate realistic base values based on the ViewPoint screenshot
         voltage_ln_base = 265  # Line-neutral voltage (V)
         current_base = random.uniform(650, 660)  # Current (A)
-        pf_base = 0.99  # Power factor
         frequency = 60 + random.uniform(-0.1, 0.1)  # Frequency (Hz)
         
-        # Calculate derived values for system
-        voltage_ll_base = voltage_ln_base * math.sqrt(3)  # Line-line voltage (V)
-        
         # Generate per-phase values with slight variations
         phase_variations = [
             random.uniform(0.98, 1.02),
@@ -99,37 +165,38 @@ class PowerMeterSimulator:
             random.uniform(0.96, 1.04)
         ]
         
-        # Calculate phase values to match ViewPoint values
+        # Calculate phase values to match ViewPoint values, accumulating
+        # the system totals as we go. Values are left unrounded; the
+        # dashboards format them for display. Each phase is a (voltage_ln,
+        # current, power_kw, apparent_power_kva, reactive_power_kvar) tuple;
+        # the power factor is fixed.
         phases = []
-        for i in range(3):
-            var = phase_variations[i]
-            voltage_ln = voltage_ln_base * var
-            current = current_base * var
-            pf = 0.99  # Fixed PF for simulation
-            
+        system_power_kw = 0.0
+        system_apparent_power_kva = 0.0
+        system_reactive_power_kvar = 0.0
+        current_total = 0.0
+        voltage_ln_total = 0.0
+        for var in phase_variations:
             # Calculate power values - targeting around 172-174 kW
             power_kw = 173 * var
-            apparent_power_kva = power_kw / pf
-            reactive_power_kvar = math.sqrt(apparent_power_kva**2 - power_kw**2)
+            apparent_power_kva = power_kw / _SIMULATED_PF
+            reactive_power_kvar = power_kw * _TAN_PHI
             
-            phases.append({
-                'voltage_ln': round(voltage_ln, 1),
-                'current': round(current, 2),
-                'power_kw': round(power_kw, 2),
-                'apparent_power_kva': round(apparent_power_kva, 2),
-                'reactive_power_kvar': round(reactive_power_kvar, 2),
-                'displacement_pf': pf,
-                'apparent_pf': pf
-            })
+            voltage_ln = voltage_ln_base * var
+            current = current_base * var
+            phases.append((voltage_ln, current, power_kw, apparent_power_kva, reactive_power_kvar))
+            
+            system_power_kw += power_kw
+            system_apparent_power_kva += apparent_power_kva
+            system_reactive_power_kvar += reactive_power_kvar
+            current_total += current
+            voltage_ln_total += voltage_ln
         
-        # Calculate system totals
-        system_power_kw = sum(phase['power_kw'] for phase in phases)
-        system_apparent_power_kva = sum(phase['apparent_power_kva'] for phase in phases)
-        system_reactive_power_kvar = sum(phase['reactive_power_kvar'] for phase in phases)
-        system_current_avg = sum(phase['current'] for phase in phases) / 3
+        # Calculate system averages
+        system_current_avg = current_total / 3
         
         # System power factor
-        system_pf = 0.99
+        system_pf = _SIMULATED_PF
             
         # Update energy based on power and time elapsed
         time_diff_hours = (current_time - self._last_timestamp) / 3600
@@ -138,18 +205,12 @@ class PowerMeterSimulator:
         self._last_timestamp = current_time
         
         # Voltage averages
-        voltage_ln_avg = sum(phase['voltage_ln'] for phase in phases) / 3
-        voltage_ll_avg = voltage_ln_avg * math.sqrt(3)
+        voltage_ln_avg = voltage_ln_total / 3
+        voltage_ll_avg = voltage_ln_avg * _SQRT3
         
         # Convert real values to raw register values for simulation
         # Using the scaling factors from the config
-        scaling = CONFIG.get('SCALING_FACTORS', {
-            'power': 0.1,
-            'current': 0.1,
-            'voltage': 0.1,
-            'pf': 0.01,
-            'frequency': 0.005
-        })
+        scaling = self._scaling
         
         # Calculate raw values
         raw_frequency = int(frequency / scaling['frequency'])
@@ -187,12 +248,13 @@ class PowerMeterSimulator:
         if not self.connected:
             self.connect()
             
-        # Generate simulated values
+        # Generate simulated values, stamped with a single clock read
+        now = time.time()
         vals = self._get_simulated_values()
         
         # Return simulated data
         return {
-            'timestamp': time.time(),
+            'timestamp': now,
             'energy_kwh': self._energy_kwh,
             'power_kw': vals['system_power_kw'],
             'reactive_power_kvar': vals['system_reactive_power_kvar'],
@@ -211,13 +273,7 @@ class PowerMeterSimulator:
                 'power': vals['raw_power'],
                 'pf': vals['raw_pf']
             },
-            'multipliers': {
-                'power': 0.1,
-                'current': 0.1,
-                'voltage': 0.1,
-                'pf': 0.01,
-                'frequency': 0.005
-            },
+            'multipliers': _MULTIPLIERS,
             'simulated': True
         }
     
@@ -231,42 +287,44 @@ class PowerMeterSimulator:
         if not self.connected:
             self.connect()
             
-        # Generate simulated values
+        # Generate simulated values, stamped with a single clock read
+        now = time.time()
         vals = self._get_simulated_values()
-        phases = vals['phases']
         
-        # Return simulated data
-        return {
-            'timestamp': time.time(),
+        # Energy counters shared by the system and per-phase blocks
+        energy_kwh = self._energy_kwh
+        reactive_energy_kvarh = energy_kwh * 0.15
+        apparent_energy_kvah = energy_kwh * 1.01
+        
+        system_power_kw = vals['system_power_kw']
+        system_pf = vals['system_pf']
+        voltage_ll_avg = vals['voltage_ll_avg']
+        
+        data = {
+            'timestamp': now,
             'data_scalar': 3,
-            'multipliers': {
-                'power': 0.1,
-                'current': 0.1,
-                'voltage': 0.1,
-                'pf': 0.01,
-                'frequency': 0.005
-            },
+            'multipliers': _MULTIPLIERS,
             'system': {
-                'energy_kwh': self._energy_kwh,
-                'power_kw': vals['system_power_kw'],
-                'demand_kw_max': vals['system_power_kw'] * 1.2,
-                'demand_kw_now': vals['system_power_kw'],
-                'power_kw_max': vals['system_power_kw'] * 1.3,
-                'power_kw_min': vals['system_power_kw'] * 0.7,
-                'reactive_energy_kvarh': self._energy_kwh * 0.15,
+                'energy_kwh': energy_kwh,
+                'power_kw': system_power_kw,
+                'demand_kw_max': system_power_kw * 1.2,
+                'demand_kw_now': system_power_kw,
+                'power_kw_max': system_power_kw * 1.3,
+                'power_kw_min': system_power_kw * 0.7,
+                'reactive_energy_kvarh': reactive_energy_kvarh,
                 'reactive_power_kvar': vals['system_reactive_power_kvar'],
-                'apparent_energy_kvah': self._energy_kwh * 1.01,
+                'apparent_energy_kvah': apparent_energy_kvah,
                 'apparent_power_kva': vals['system_apparent_power_kva'],
-                'displacement_pf': vals['system_pf'],
-                'apparent_pf': vals['system_pf'],
+                'displacement_pf': system_pf,
+                'apparent_pf': system_pf,
                 'current_avg': vals['system_current_avg'],
-                'voltage_ll_avg': vals['voltage_ll_avg'],
+                'voltage_ll_avg': voltage_ll_avg,
                 'voltage_ln_avg': vals['voltage_ln_avg']
             },
             'voltages': {
-                'l1_l2': vals['voltage_ll_avg'] * 0.99,
-                'l2_l3': vals['voltage_ll_avg'] * 1.01,
-                'l1_l3': vals['voltage_ll_avg']
+                'l1_l2': voltage_ll_avg * 0.99,
+                'l2_l3': voltage_ll_avg * 1.01,
+                'l1_l3': voltage_ll_avg
             },
             'frequency': vals['frequency'],
             'raw_values': {
@@ -277,48 +335,33 @@ class PowerMeterSimulator:
                 'power': vals['raw_power'],
                 'pf': vals['raw_pf'],
                 'data_scalar': 3
-            },
-            'phase_1': {
-                'energy_kwh': self._energy_kwh / 3,
-                'power_kw': phases[0]['power_kw'],
-                'reactive_energy_kvarh': self._energy_kwh * 0.15 / 3,
-                'reactive_power_kvar': phases[0]['reactive_power_kvar'],
-                'apparent_energy_kvah': self._energy_kwh * 1.01 / 3,
-                'apparent_power_kva': phases[0]['apparent_power_kva'],
-                'displacement_pf': phases[0]['displacement_pf'],
-                'apparent_pf': phases[0]['apparent_pf'],
-                'current': phases[0]['current'],
-                'voltage_ln': phases[0]['voltage_ln']
-            },
-            'phase_2': {
-                'energy_kwh': self._energy_kwh / 3,
-                'power_kw': phases[1]['power_kw'],
-                'reactive_energy_kvarh': self._energy_kwh * 0.15 / 3,
-                'reactive_power_kvar': phases[1]['reactive_power_kvar'],
-                'apparent_energy_kvah': self._energy_kwh * 1.01 / 3,
-                'apparent_power_kva': phases[1]['apparent_power_kva'],
-                'displacement_pf': phases[1]['displacement_pf'],
-                'apparent_pf': phases[1]['apparent_pf'],
-                'current': phases[1]['current'],
-                'voltage_ln': phases[1]['voltage_ln']
-            },
-            'phase_3': {
-                'energy_kwh': self._energy_kwh / 3,
-                'power_kw': phases[2]['power_kw'],
-                'reactive_energy_kvarh': self._energy_kwh * 0.15 / 3,
-                'reactive_power_kvar': phases[2]['reactive_power_kvar'],
-                'apparent_energy_kvah': self._energy_kwh * 1.01 / 3,
-                'apparent_power_kva': phases[2]['apparent_power_kva'],
-                'displacement_pf': phases[2]['displacement_pf'],
-                'apparent_pf': phases[2]['apparent_pf'],
-                'current': phases[2]['current'],
-                'voltage_ln': phases[2]['voltage_ln']
-            },
-            'time_since_reset': int(time.time() % 100000),
-            'data_tick_counter': int(time.time() % 60),
-            'simulated': True
+            }
         }
         
+        # Energy is split evenly between the phases
+        phase_energy_kwh = energy_kwh / 3
+        phase_reactive_energy_kvarh = reactive_energy_kvarh / 3
+        phase_apparent_energy_kvah = apparent_energy_kvah / 3
+        phases = vals['phases']
+        for number, (voltage_ln, current, power_kw, apparent_power_kva, reactive_power_kvar) in enumerate(phases, 1):
+            data[f'phase_{number}'] = {
+                'energy_kwh': phase_energy_kwh,
+                'power_kw': power_kw,
+                'reactive_energy_kvarh': phase_reactive_energy_kvarh,
+                'reactive_power_kvar': reactive_power_kvar,
+                'apparent_energy_kvah': phase_apparent_energy_kvah,
+                'apparent_power_kva': apparent_power_kva,
+                'displacement_pf': system_pf,
+                'apparent_pf': system_pf,
+                'current': current,
+                'voltage_ln': voltage_ln
+            }
+        
+        data['time_since_reset'] = int(now % 100000)
+        data['data_tick_counter'] = int(now % 60)
+        data['simulated'] = True
+        return data
+        
     def read_data(self):
         """
         Convenience method that calls read_basic_data or read_detailed_data
@@ -327,10 +370,8 @@ class PowerMeterSimulator:
         Returns:
         - Dictionary of simulated meter data
         """
-        from config.settings import CONFIG
-        
         # Use detailed data if configured, otherwise use basic data
-        if CONFIG.get('DETAILED_DATA', False):
+        if self._detailed:
             return self.read_detailed_data()
         else:
             return self.read_basic_data()
@@ -23,13 +23,10 @@ Features:
     - Extensible architecture for easy test addition
 """
 
-import argparse
+import ast
 import sys
 import os
-import subprocess
 import logging
-import importlib.util
-import glob
 from pathlib import Path
 
 # Add project root to path
@@ -37,20 +34,47 @@ project_root = Path(__file__).parent.absolute()
 sys.path.insert(0, str(project_root))
 
 def setup_logging(verbose: bool = False):
-    """Setup logging configuration"""
-    level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.StreamHandler()]
-    )
+    """
+    Setup logging configuration
+    
+    config.settings attaches the log file (logs/powermeter.log) and console
+    handlers when it is imported, so it is imported here before anything
+    else configures the root logger. Without --verbose the level comes from
+    the POWERMETER_LOGLEVEL environment variable (e.g. WARNING to drop
+    per-request and per-poll messages), defaulting to INFO.
+    """
+    if verbose:
+        level = logging.DEBUG
+    else:
+        level = logging.getLevelName(os.environ.get('POWERMETER_LOGLEVEL', 'INFO').upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    
+    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    try:
+        import config.settings  # noqa: F401 - configures the log handlers
+    except ImportError:
+        pass
+    logging.basicConfig(level=level, format=log_format, handlers=[logging.StreamHandler()])
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    
+    # Keep writing the log file even if something configured logging first
+    if not any(isinstance(handler, logging.FileHandler) for handler in root_logger.handlers):
+        log_dir = project_root / 'logs'
+        log_dir.mkdir(exist_ok=True)
+        file_handler = logging.FileHandler(log_dir / 'powermeter.log')
+        file_handler.setFormatter(logging.Formatter(log_format))
+        root_logger.addHandler(file_handler)
 
 def discover_test_modules():
     """
     Automatically discover test modules from the test/ directory.
     
     Scans for *_test.py files and looks for functions matching run_*_test() pattern.
-    Creates CLI commands automatically based on discovered tests.
+    Creates CLI commands automatically based on discovered tests. The files are
+    only parsed here; a test module is imported when its command is run.
     
     Returns:
         dict: Dictionary mapping command names to test module info
@@ -66,36 +90,54 @@ def discover_test_modules():
     
     for test_file in test_files:
         try:
-            # Load the module
+            # Parse the module without executing it
             module_name = test_file.stem
-            spec = importlib.util.spec_from_file_location(module_name, test_file)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            tree = ast.parse(test_file.read_bytes(), filename=str(test_file))
+            functions = {
+                node.name: node for node in tree.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            }
             
             # Look for run_*_test functions
-            for attr_name in dir(module):
+            for attr_name in sorted(functions):
                 if attr_name.startswith('run_') and attr_name.endswith('_test'):
-                    func = getattr(module, attr_name)
-                    if callable(func):
-                        # Generate command name from function name
-                        # run_database_connection_test -> test-database-connection
-                        # run_network_ports_test -> test-network-ports  
-                        cmd_name = attr_name.replace('run_', 'test-').replace('_test', '').replace('_', '-')
-                        
-                        # Get help text from docstring
-                        help_text = func.__doc__.strip().split('\n')[0] if func.__doc__ else f"Run {attr_name}"
-                        
-                        test_commands[cmd_name] = {
-                            'function': func,
-                            'module': module_name,
-                            'file': str(test_file),
-                            'help': help_text
-                        }
+                    # Generate command name from function name
+                    # run_database_connection_test -> test-database-connection
+                    # run_network_ports_test -> test-network-ports  
+                    cmd_name = attr_name.replace('run_', 'test-').replace('_test', '').replace('_', '-')
+                    
+                    # Get help text from docstring
+                    docstring = ast.get_docstring(functions[attr_name])
+                    help_text = docstring.strip().split('\n')[0] if docstring else f"Run {attr_name}"
+                    
+                    test_commands[cmd_name] = {
+                        'function': attr_name,
+                        'module': module_name,
+                        'file': str(test_file),
+                        'help': help_text
+                    }
         except Exception as e:
             print(f"Warning: Could not load test module {test_file}: {e}")
     
     return test_commands
 
+def load_test_function(test_info):
+    """
+    Import a discovered test module and return its test function.
+    
+    Args:
+        test_info (dict): Test module info from discover_test_modules()
+    
+    Returns:
+        callable: The module's run_*_test function
+    """
+    import importlib.util
+    
+    spec = importlib.util.spec_from_file_location(test_info['module'], test_info['file'])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, test_info['function'])
+
 def run_production_app(args):
     """Start the main power meter monitoring application (production mode)"""
     print("Production Mode - Power Meter Monitor")
@@ -162,6 +204,9 @@ def show_system_status(args):
         print(f"  Core Modules: {project_root / 'core'}")
         print(f"  API Modules: {project_root / 'api'}")
         print(f"  Logs Directory: {project_root / 'logs'}")
+        log_files = [handler.baseFilename for handler in logging.getLogger().handlers
+                     if isinstance(handler, logging.FileHandler)]
+        print(f"  Log File: {log_files[0] if log_files else 'NOT ATTACHED'}")
         print(f"  Data Directory: {project_root / 'data'}")
         
         # Check critical files
@@ -219,25 +264,24 @@ def install_dependencies(args):
         print("Make sure you're running this from the project directory")
         return 1
     
+    import subprocess
+    
     try:
         print("Installing packages from requirements.txt...")
         print("This may take a few minutes...")
         
-        result = subprocess.run([
-            sys.executable, '-m', 'pip', 'install', '-r', str(requirements_file)
-        ], check=True, capture_output=True, text=True)
+        # Let pip write straight to the terminal so progress is visible
+        subprocess.run([
+            sys.executable, '-m', 'pip', 'install', '-r', str(requirements_file),
+            '--disable-pip-version-check', '--no-input', '--prefer-binary'
+        ], check=True)
         
         print("Dependencies installed successfully!")
-        if result.stdout:
-            print("\nInstallation Output:")
-            print(result.stdout)
         
         return 0
         
     except subprocess.CalledProcessError as e:
         print(f"Error installing dependencies: {e}")
-        if e.stderr:
-            print(f"Error details: {e.stderr}")
         print("\nTry running: pip install -r requirements.txt manually")
         return 1
     except Exception as e:
@@ -248,14 +292,40 @@ def create_dynamic_test_command(test_info):
     """Create a dynamic command function for a discovered test"""
     def test_command(args):
         try:
-            return test_info['function']()
+            return load_test_function(test_info)()
         except Exception as e:
             print(f"Error running {test_info['module']}: {e}")
             return 1
     return test_command
 
+def run_command(func, args):
+    """Run a command function, reporting interrupts and unexpected errors"""
+    try:
+        return func(args)
+    except KeyboardInterrupt:
+        print("\nOperation cancelled by user")
+        return 1
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return 1
+
+# Built-in commands that take no options of their own
+CORE_COMMANDS = {
+    'start': run_production_app,
+    'test': run_simulator_test,
+    'status': show_system_status,
+    'install': install_dependencies,
+}
+
 def main():
     """Main CLI entry point with auto-discovery"""
+    # A bare built-in command needs neither the parser nor test discovery
+    if len(sys.argv) == 2 and sys.argv[1] in CORE_COMMANDS:
+        setup_logging()
+        return run_command(CORE_COMMANDS[sys.argv[1]], None)
+    
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Power Meter Monitor - Control and test your power monitoring system",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -305,14 +375,7 @@ def main():
         return 1
     
     # Run the selected command
-    try:
-        return args.func(args)
-    except KeyboardInterrupt:
-        print("\nOperation cancelled by user")
-        return 1
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return 1
+    return run_command(args.func, args)
 
 if __name__ == '__main__':
     sys.exit(main())
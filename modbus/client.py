@@ -2,13 +2,22 @@
 Modbus client for communicating with power meters over serial connections
 """
 import logging
+import struct
+import sys
 import time
 import binascii
+import threading
 import serial
 from modbus.protocol import build_command, parse_response, get_expected_response_length
 
 logger = logging.getLogger('powermeter.modbus.client')
 
+# Most distinct read commands kept by a client before the cache is reset
+_READ_COMMAND_CACHE_SIZE = 256
+
+# Largest number of registers a single read holding registers request may ask for
+MAX_READ_COUNT = 125
+
 class ModbusClient:
     """Modbus RTU client for communication with power meters"""
     
@@ -18,6 +27,13 @@ class ModbusClient:
         self.device_address = device_address
         self.timeout = timeout
         self.serial = None
+        # Serializes request/response exchanges on the shared port
+        self._lock = threading.RLock()
+        # (device_address, register_address, register_count) ->
+        # (command bytes, expected response length)
+        self._read_commands = {}
+        # (device_address, register_address) -> last value seen by read_registers_changed
+        self._last_values = {}
         
     def connect(self):
         """Connect to the serial port"""
@@ -63,52 +79,81 @@ class ModbusClient:
                 dsrdtr=CONFIG.get('SERIAL_DSRDTR', False)
             )
             
+            if CONFIG.get('SERIAL_LOW_LATENCY', False):
+                self._enable_low_latency()
+            
             logger.info(f"Successfully connected to {self.port}")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to {self.port}: {str(e)}")
             return False
             
+    def _enable_low_latency(self):
+        """
+        Ask the serial driver to deliver received bytes without delay
+        
+        Only supported on Linux; elsewhere, or if the driver refuses, the
+        port is left with its default settings.
+        """
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            self.serial.set_low_latency_mode(True)
+            logger.info(f"Low latency mode enabled on {self.port}")
+        except Exception as e:
+            logger.debug(f"Could not enable low latency mode on {self.port}: {str(e)}")
+            
     def disconnect(self):
         """Disconnect from the serial port"""
         if self.serial and self.serial.is_open:
             self.serial.close()
             logger.info("Serial connection closed")
     
-    def send_command(self, command):
+    def send_command(self, command, expected_length=None):
         """
         Send a pre-built Modbus command and return the response
         
         Parameters:
         - command: The command bytes to send
+        - expected_length: Response length in bytes, if already known
         
         Returns:
         - Response bytes or None if error
         """
-        if not self.serial or not self.serial.is_open:
-            if not self.connect():
-                return None
+        with self._lock:
+            if not self.serial or not self.serial.is_open:
+                if not self.connect():
+                    return None
+                    
+            try:
+                # Clear any pending data
+                self.serial.reset_input_buffer()
                 
-        try:
-            # Clear any pending data
-            self.serial.reset_input_buffer()
-            
-            # Send the command
-            self.serial.write(command)
-            
-            # Calculate expected response length
-            expected_length = get_expected_response_length(command)
-            
-            # Read response
-            response = self.serial.read(expected_length)
-            
-            # Log the response
-            logger.debug(f"Received response: {binascii.hexlify(response).decode()}")
-            
-            return response
-        except Exception as e:
-            logger.error(f"Error sending command: {str(e)}")
-            return None
+                # Send the command
+                self.serial.write(command)
+                
+                # Calculate expected response length
+                if expected_length is None:
+                    expected_length = get_expected_response_length(command)
+                
+                # Read the address and function code first; an exception
+                # reply is only 5 bytes long and would otherwise leave the
+                # read waiting out the full timeout
+                response = self.serial.read(2)
+                if len(response) == 2:
+                    if response[1] & 0x80:
+                        response += self.serial.read(3)
+                    else:
+                        response += self.serial.read(expected_length - 2)
+                
+                # Log the response (skip the hex conversion unless it will be shown)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Received response: {binascii.hexlify(response).decode()}")
+                
+                return response
+            except Exception as e:
+                logger.error(f"Error sending command: {str(e)}")
+                return None
     
     def read_registers(self, register_address, register_count=1):
         """
@@ -121,17 +166,76 @@ class ModbusClient:
         Returns:
         - List of register values or None if error
         """
+        payload = self.read_registers_raw(register_address, register_count)
+        if payload is None:
+            return None
+        
+        # Extract register values (big-endian, two bytes each)
+        registers = list(struct.unpack_from(f'>{len(payload) // 2}H', payload))
+            
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Read {len(registers)} registers from {register_address}: {registers}")
+        return registers
+    
+    def read_registers_changed(self, register_address, register_count=1):
+        """
+        Read holding registers and report only the values that changed
+        
+        Values are compared with those returned by the previous call that
+        covered the same registers, so the first read reports every register.
+        
+        Parameters:
+        - register_address: Starting register address
+        - register_count: Number of registers to read
+        
+        Returns:
+        - Dictionary mapping changed register addresses to their new values
+          (empty if nothing changed), or None if error
+        """
+        registers = self.read_registers(register_address, register_count)
+        if registers is None:
+            return None
+        
+        last_values = self._last_values
+        device_address = self.device_address
+        changed = {}
+        for address, value in enumerate(registers, register_address):
+            key = (device_address, address)
+            if last_values.get(key) != value:
+                last_values[key] = value
+                changed[address] = value
+        return changed
+    
+    def read_registers_raw(self, register_address, register_count=1):
+        """
+        Read holding registers and return their undecoded data bytes
+        
+        Parameters:
+        - register_address: Starting register address
+        - register_count: Number of registers to read
+        
+        Returns:
+        - Register data bytes (big-endian, two per register) or None if error
+        """
         try:
-            # Build the command
-            command = build_command(
-                self.device_address, 
-                3,  # Function code 3 = Read Holding Registers
-                register_address, 
-                register_count
-            )
+            # Reuse the command built for an earlier read of the same range
+            key = (self.device_address, register_address, register_count)
+            cached = self._read_commands.get(key)
+            if cached is None:
+                command = build_command(
+                    self.device_address, 
+                    3,  # Function code 3 = Read Holding Registers
+                    register_address, 
+                    register_count
+                )
+                cached = (bytes(command), get_expected_response_length(command))
+                if len(self._read_commands) >= _READ_COMMAND_CACHE_SIZE:
+                    self._read_commands.clear()
+                self._read_commands[key] = cached
+            command, expected_length = cached
             
             # Send the command
-            response = self.send_command(command)
+            response = self.send_command(command, expected_length)
             
             if not response or len(response) < 3:
                 logger.warning(f"Invalid response when reading registers from {register_address}")
@@ -143,24 +247,63 @@ class ModbusClient:
                 logger.error(f"Modbus error when reading registers: function={response[1]}, error={error_code}")
                 return None
                 
-            # Parse the response
+            # The data follows the address, function code and byte count, and
+            # must be complete (a reply cut short by the timeout is not)
             byte_count = response[2]
-            
-            # Extract register values
-            registers = []
-            for i in range(byte_count // 2):
-                high_byte = response[3 + i * 2]
-                low_byte = response[3 + i * 2 + 1]
-                value = (high_byte << 8) | low_byte
-                registers.append(value)
-                
-            logger.debug(f"Read {len(registers)} registers from {register_address}: {registers}")
-            return registers
+            if byte_count != 2 * register_count or len(response) < 3 + byte_count + 2:
+                logger.warning(f"Incomplete response when reading {register_count} registers from {register_address}: "
+                               f"{len(response)} bytes, byte count {byte_count}")
+                return None
+            return bytes(response[3:3 + byte_count])
             
         except Exception as e:
             logger.error(f"Error reading registers from {register_address}: {str(e)}")
             return None
     
+    def read_many(self, spans, raw=False):
+        """
+        Read several register ranges back to back
+        
+        The port is held for the whole sequence, so no other request can
+        be interleaved between the reads.
+        
+        Parameters:
+        - spans: List of (register_address, register_count) tuples
+        - raw: Return undecoded data bytes instead of register lists
+        
+        Returns:
+        - List with one result per span, each None if that read failed
+        """
+        read = self.read_registers_raw if raw else self.read_registers
+        with self._lock:
+            return [read(register_address, register_count) for register_address, register_count in spans]
+    
+    def read_registers_batched(self, register_addresses):
+        """
+        Read a set of individual registers using as few requests as possible
+        
+        Consecutive addresses are grouped into runs of at most MAX_READ_COUNT
+        registers and each run is fetched with a single read.
+        
+        Parameters:
+        - register_addresses: Iterable of register addresses, in any order
+        
+        Returns:
+        - Dictionary mapping each address to its value, or None if its read failed
+        """
+        spans = []
+        for address in sorted(set(register_addresses)):
+            if spans and address == spans[-1][0] + spans[-1][1] and spans[-1][1] < MAX_READ_COUNT:
+                spans[-1][1] += 1
+            else:
+                spans.append([address, 1])
+        
+        values = {}
+        for (start, count), registers in zip(spans, self.read_many(spans)):
+            for offset in range(count):
+                values[start + offset] = registers[offset] if registers and len(registers) > offset else None
+        return values
+    
     def write_register(self, register_address, value):
         """
         Write a single register value
@@ -229,7 +372,7 @@ class ModbusClient:
                 }
                 
             # Parse the response
-            parsed = parse_response(command_bytes, response)
+            parsed = parse_response(command_bytes, response, include_hex=True)
             
             return {
                 "parsed": parsed,
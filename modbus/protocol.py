@@ -4,22 +4,44 @@ command building, and response parsing.
 """
 import logging
 import binascii
+import struct
 
 logger = logging.getLogger('powermeter.modbus.protocol')
 
-def calculate_crc(data):
-    """Calculate Modbus RTU CRC-16 for given data"""
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
+def _build_crc_table():
+    """Precompute the CRC-16 (polynomial 0xA001) remainder for every byte value"""
+    table = []
+    for byte in range(256):
+        crc = byte
         for _ in range(8):
             if crc & 0x0001:
                 crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+_CRC_TABLE = _build_crc_table()
+
+# Frame layouts: device address, function code and register address,
+# optionally followed by a count/value word and a byte count
+_HEADER = struct.Struct('>BBH')
+_HEADER_WORD = struct.Struct('>BBHH')
+_WRITE_MULTIPLE_HEADER = struct.Struct('>BBHHB')
+
+def calculate_crc(data):
+    """Calculate Modbus RTU CRC-16 for given data"""
+    crc = 0xFFFF
+    table = _CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     # Return CRC as two bytes in little-endian order (low byte first)
     return crc.to_bytes(2, byteorder='little')
 
+def to_modbus_address(register_address):
+    """Convert a register number in 4xxxx format to a zero-based Modbus address"""
+    return register_address - 40001 if register_address >= 40001 else register_address
+
 def build_command(device_address, function_code, register_address, register_count=1, register_values=None):
     """
     Build a Modbus RTU command
@@ -36,76 +58,52 @@ def build_command(device_address, function_code, register_address, register_coun
     """
     # Convert register address from 4xxxx format if needed
     original_address = register_address
-    if register_address >= 40001:
-        register_address -= 40001
+    register_address = to_modbus_address(register_address)
         
     # Log the address conversion for debugging
-    logger.debug(f"Modbus command: Register {original_address} → Modbus address {register_address} (0x{register_address:04X})")
-    logger.debug(f"High byte: 0x{(register_address >> 8) & 0xFF:02X}, Low byte: 0x{register_address & 0xFF:02X}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Modbus command: Register {original_address} → Modbus address {register_address} (0x{register_address:04X})")
+        logger.debug(f"High byte: 0x{(register_address >> 8) & 0xFF:02X}, Low byte: 0x{register_address & 0xFF:02X}")
         
-    # Start building the command
-    command = bytearray([
-        device_address,
-        function_code,
-        (register_address >> 8) & 0xFF,  # Register address high byte
-        register_address & 0xFF,         # Register address low byte
-    ])
-    
-    # Add register count/values based on function code
+    # Build the command in a buffer sized for the whole frame, CRC included:
+    # address, function code and register address, then the function's fields
     if function_code == 3 or function_code == 4:  # Read operations
-        command.extend([
-            (register_count >> 8) & 0xFF,    # Number of registers high byte
-            register_count & 0xFF            # Number of registers low byte
-        ])
+        # Number of registers to read
+        command = bytearray(_HEADER_WORD.size + 2)
+        _HEADER_WORD.pack_into(command, 0, device_address, function_code, register_address & 0xFFFF, register_count & 0xFFFF)
     elif function_code == 6:  # Write Single Register
-        if register_values and len(register_values) > 0:
-            value = register_values[0]
-            command.extend([
-                (value >> 8) & 0xFF,   # Value high byte
-                value & 0xFF           # Value low byte
-            ])
-        else:
-            command.extend([0x00, 0x00])  # Default to zero if no value provided
+        # Value to write, defaulting to zero if no value provided
+        value = register_values[0] if register_values else 0
+        command = bytearray(_HEADER_WORD.size + 2)
+        _HEADER_WORD.pack_into(command, 0, device_address, function_code, register_address & 0xFFFF, value & 0xFFFF)
     elif function_code == 16:  # Write Multiple Registers
-        if register_values and len(register_values) > 0:
-            command.extend([
-                (register_count >> 8) & 0xFF,  # Number of registers high byte
-                register_count & 0xFF,         # Number of registers low byte
-                register_count * 2             # Byte count
-            ])
-            # Add each register value
-            for value in register_values:
-                command.extend([
-                    (value >> 8) & 0xFF,  # Value high byte
-                    value & 0xFF          # Value low byte
-                ])
-        else:
-            # Default to writing zeros
-            command.extend([
-                (register_count >> 8) & 0xFF,  # Number of registers high byte
-                register_count & 0xFF,         # Number of registers low byte
-                register_count * 2             # Byte count
-            ])
-            # Add zero values
-            for _ in range(register_count):
-                command.extend([0x00, 0x00])
+        # Number of registers and byte count, then each value (zeros if none provided)
+        values = register_values if register_values else [0] * register_count
+        command = bytearray(_WRITE_MULTIPLE_HEADER.size + 2 * len(values) + 2)
+        _WRITE_MULTIPLE_HEADER.pack_into(command, 0, device_address, function_code, register_address & 0xFFFF,
+                                         register_count & 0xFFFF, register_count * 2)
+        struct.pack_into(f'>{len(values)}H', command, _WRITE_MULTIPLE_HEADER.size, *[value & 0xFFFF for value in values])
+    else:
+        command = bytearray(_HEADER.size + 2)
+        _HEADER.pack_into(command, 0, device_address, function_code, register_address & 0xFFFF)
     
-    # Calculate and append CRC
-    crc = calculate_crc(command)
-    command.extend(crc)
+    # Calculate CRC over everything before it and write it into the last two bytes
+    command[-2:] = calculate_crc(memoryview(command)[:-2])
     
     # Log the complete command for debugging
-    logger.debug(f"Complete command: {binascii.hexlify(command).decode()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Complete command: {binascii.hexlify(command).decode()}")
     
     return command
 
-def parse_response(command, response):
+def parse_response(command, response, include_hex=False):
     """
     Parse a Modbus response into a structured format
     
     Parameters:
     - command: The original command bytes
     - response: The response bytes
+    - include_hex: Also return hex strings for register values
     
     Returns:
     - Dictionary containing parsed response data
@@ -146,16 +144,9 @@ def parse_response(command, response):
             byte_count = response[2]
             register_count = byte_count // 2
             
-            # Extract register values
-            registers = []
-            for i in range(register_count):
-                high_byte = response[3 + i * 2]
-                low_byte = response[3 + i * 2 + 1]
-                value = (high_byte << 8) | low_byte
-                registers.append({
-                    "value": value,
-                    "hex": hex(value)
-                })
+            # Extract register values; hex strings, when requested, go in a
+            # parallel list rather than a dict per register
+            registers = list(struct.unpack_from(f'>{register_count}H', response, 3))
             
             # Get the register address from the request
             if len(command) >= 4:
@@ -165,6 +156,8 @@ def parse_response(command, response):
             result["byte_count"] = byte_count
             result["register_count"] = register_count
             result["registers"] = registers
+            if include_hex:
+                result["hex_values"] = list(map(hex, registers))
             
         elif function_code == 6:
             # Write single register response
@@ -173,7 +166,8 @@ def parse_response(command, response):
             
             result["register_address"] = register_address
             result["register_value"] = register_value
-            result["register_value_hex"] = hex(register_value)
+            if include_hex:
+                result["register_value_hex"] = hex(register_value)
             
         elif function_code == 16:
             # Write multiple registers response
@@ -47,42 +47,43 @@ REGISTERS = {
     'DEMAND_WINDOW_SIZE': 44603
 }
 
-# Register groupings for common operations
+# Register groupings for common operations (read-only; contiguous blocks are ranges)
 REGISTER_GROUPS = {
-    'BASIC': [
+    'BASIC': (
         REGISTERS['POWER_KW'],
         REGISTERS['CURRENT_AVG'],
         REGISTERS['VOLTAGE_LL_AVG'],
         REGISTERS['VOLTAGE_LN_AVG'],
         REGISTERS['FREQUENCY'],
         REGISTERS['DISPLACEMENT_PF']
-    ],
-    'ENERGY': [
+    ),
+    'ENERGY': (
         REGISTERS['ENERGY_KWH_LSW'],
         REGISTERS['ENERGY_KWH_MSW'],
         REGISTERS['REACTIVE_ENERGY_KVARH_LSW'],
         REGISTERS['REACTIVE_ENERGY_KVARH_MSW'],
         REGISTERS['APPARENT_ENERGY_KVAH_LSW'],
         REGISTERS['APPARENT_ENERGY_KVAH_MSW']
-    ],
-    'POWER': [
+    ),
+    'POWER': (
         REGISTERS['POWER_KW'],
         REGISTERS['REACTIVE_POWER_KVAR'],
         REGISTERS['APPARENT_POWER_KVA']
-    ],
-    'SYSTEM': list(range(44001, 44023)),  # All system registers
-    'PHASE_1': list(range(44023, 44031)),  # All phase 1 registers
-    'PHASE_2': list(range(44031, 44040)),  # All phase 2 registers
-    'PHASE_3': list(range(44040, 44050))   # All phase 3 registers
+    ),
+    'SYSTEM': range(44001, 44023),  # All system registers
+    'PHASE_1': range(44023, 44031),  # All phase 1 registers
+    'PHASE_2': range(44031, 44040),  # All phase 2 registers
+    'PHASE_3': range(44040, 44050)   # All phase 3 registers
 }
 
+# Reverse lookup of REGISTERS (address -> name)
+_REGISTER_NAMES = {address: name for name, address in REGISTERS.items()}
+
 def get_register_name(register_address):
     """Get the name of a register by its address"""
-    for name, address in REGISTERS.items():
-        if address == register_address:
-            return name
-    return f"UNKNOWN_{register_address}"
+    name = _REGISTER_NAMES.get(register_address)
+    return name if name is not None else f"UNKNOWN_{register_address}"
 
 def get_register_group(group_name):
-    """Get a list of registers in a group by name"""
-    return REGISTER_GROUPS.get(group_name.upper(), [])
\ No newline at end of file
+    """Get the registers in a group by name (a tuple or range, empty if unknown)"""
+    return REGISTER_GROUPS.get(group_name.upper(), ())
\ No newline at end of file
@@ -11,6 +11,7 @@ Functions:
 import os
 import sys
 import pyodbc
+from datetime import datetime
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -28,6 +29,7 @@ def run_database_connection_test():
     - Connection establishment test
     - Table existence verification
     - Record count reporting
+    - Batched insert check (rolled back, nothing is stored)
     
     Returns:
         bool: True if all tests pass, False if any test fails
@@ -85,6 +87,20 @@ def run_database_connection_test():
             cursor.execute(f"SELECT COUNT(*) FROM {CONFIG.get('DATABASE_TABLE')}")
             count = cursor.fetchone()[0]
             print(f"Number of records: {count}")
+            
+            # Exercise the batched insert path used by the data logger
+            print("\nTesting batched insert (fast_executemany)...")
+            rows = [(datetime.now(), 0.0, 0.0, 0.0)] * 3
+            try:
+                cursor.fast_executemany = True
+            except AttributeError:
+                print("fast_executemany not supported by this pyodbc version, using plain executemany")
+            cursor.executemany(
+                f"INSERT INTO {CONFIG.get('DATABASE_TABLE')} ([timestamp], power_kw, current_avg, frequency) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            connection.rollback()
+            print(f"Batched insert of {len(rows)} rows OK (rolled back)")
         else:
             print(f"\nTable '{CONFIG.get('DATABASE_TABLE')}' does not exist yet")
             print("It will be created when you run the main application")
@@ -8,9 +8,13 @@ Functions:
     run_example_test: Example test function that gets auto-discovered
 """
 
+import os
 import time
 import random
 
+# Scale for the demo pauses between steps (EXAMPLE_TEST_PACE=1 restores them)
+_PACE = float(os.environ.get('EXAMPLE_TEST_PACE', '0'))
+
 def run_example_test():
     """
     Run an example test to demonstrate auto-discovery
@@ -40,7 +44,8 @@ def run_example_test():
         
         # Step 1: Initialize
         print("  1. Initializing test environment...")
-        time.sleep(0.5)
+        if _PACE:
+            time.sleep(0.5 * _PACE)
         print("     ✓ Test environment ready")
         
         # Step 2: Generate test data
@@ -51,12 +56,14 @@ def run_example_test():
             'current_avg': round(random.uniform(1, 10), 2),
             'frequency': round(random.uniform(59.8, 60.2), 1)
         }
-        time.sleep(0.3)
+        if _PACE:
+            time.sleep(0.3 * _PACE)
         print(f"     ✓ Generated test data: {test_data}")
         
         # Step 3: Validate test data
         print("  3. Validating test data...")
-        time.sleep(0.2)
+        if _PACE:
+            time.sleep(0.2 * _PACE)
         
         validation_passed = True
         if test_data['power_kw'] < 0 or test_data['power_kw'] > 1000:
@@ -10,17 +10,23 @@ Functions:
     start_server: Start a test server on a specified port
 """
 
+import functools
 import http.server
-import socketserver
+import signal
 import threading
 import socket
 
+# Seconds between checks for a stop request while the servers run
+STOP_POLL_SECONDS = 0.5
+
+@functools.lru_cache(maxsize=1)
 def get_local_ip():
     """
     Get the local IP address of this machine.
     
     Uses a UDP socket connection to determine which local interface
-    would be used for external connectivity.
+    would be used for external connectivity. The result is cached for
+    the life of the process.
     
     Returns:
         str: Local IP address or '127.0.0.1' as fallback
@@ -29,72 +35,99 @@ def get_local_ip():
         # Create a socket that connects to an external server
         # This doesn't actually establish a connection but helps determine
         # which local interface would be used
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-        return local_ip
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # Never let a missing route hold up startup
+            s.settimeout(1)
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
     except Exception:
         return "127.0.0.1"  # Fallback to localhost
 
-class NetworkTestHTTPHandler(http.server.SimpleHTTPRequestHandler):
-    """Custom HTTP request handler for network testing"""
-    
-    def do_GET(self):
-        """Handle GET requests with network test information"""
-        self.send_response(200)
-        self.send_header("Content-type", "text/html")
-        self.end_headers()
-        
-        # Get server port
-        port = self.server.server_address[1]
-        
-        # Create a simple HTML response showing IP and port
-        html = f"""
+# Test page; filled in per request with the server IP, port and time
+_PAGE_TEMPLATE = """
         <html>
         <head>
-            <title>Port {port} is open!</title>
+            <title>Port %(port)s is open!</title>
             <style>
-                body {{ font-family: Arial, sans-serif; text-align: center; margin-top: 50px; }}
-                .container {{ padding: 20px; background-color: #f0f0f0; border-radius: 10px; display: inline-block; }}
-                .success {{ color: green; font-size: 24px; }}
-                .info {{ margin: 20px; padding: 15px; background-color: #e7f3ff; border-radius: 5px; }}
+                body { font-family: Arial, sans-serif; text-align: center; margin-top: 50px; }
+                .container { padding: 20px; background-color: #f0f0f0; border-radius: 10px; display: inline-block; }
+                .success { color: green; font-size: 24px; }
+                .info { margin: 20px; padding: 15px; background-color: #e7f3ff; border-radius: 5px; }
             </style>
         </head>
         <body>
             <div class="container">
                 <h1 class="success">Network Test Successful!</h1>
-                <p>You've successfully connected to <strong>{get_local_ip()}</strong> on port <strong>{port}</strong></p>
-                <p>This confirms that port {port} is open and accessible from your network.</p>
+                <p>You've successfully connected to <strong>%(ip)s</strong> on port <strong>%(port)s</strong></p>
+                <p>This confirms that port %(port)s is open and accessible from your network.</p>
                 <div class="info">
                     <h3>Network Information</h3>
-                    <p>Server IP: {get_local_ip()}</p>
-                    <p>Server Port: {port}</p>
+                    <p>Server IP: %(ip)s</p>
+                    <p>Server Port: %(port)s</p>
                     <p>Connection Status: Active</p>
-                    <p>Test Time: {self.date_time_string()}</p>
+                    <p>Test Time: %(time)s</p>
                 </div>
             </div>
         </body>
         </html>
         """
+
+class NetworkTestHTTPHandler(http.server.SimpleHTTPRequestHandler):
+    """Custom HTTP request handler for network testing"""
+    
+    # Keep connections open between requests
+    protocol_version = 'HTTP/1.1'
+    
+    # Set TCP_NODELAY on each connection so small responses aren't held back
+    disable_nagle_algorithm = True
+    
+    def do_GET(self):
+        """Handle GET requests with network test information"""
+        # Fill in the page showing IP and port
+        html = _PAGE_TEMPLATE % {
+            'ip': get_local_ip(),
+            'port': self.server.server_address[1],
+            'time': self.date_time_string()
+        }
+        body = html.encode()
+        
+        self.send_response(200)
+        self.send_header("Content-type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
         
-        self.wfile.write(html.encode())
+        self.wfile.write(body)
+
+class NetworkTestServer(http.server.ThreadingHTTPServer):
+    """Test server handling each connection in its own thread"""
+    
+    # Allow the socket to be reused (must be set before the socket is bound)
+    allow_reuse_address = True
+    daemon_threads = True
+    # Queue more pending connections than socketserver's default of 5
+    request_queue_size = 128
 
 def start_server(port):
     """
-    Start a test server on the specified port.
+    Start a test server on the specified port in a background thread.
     
     Args:
         port (int): Port number to start the server on
+    
+    Returns:
+        NetworkTestServer: The running server; call shutdown() and
+        server_close() to stop it
     """
     handler = NetworkTestHTTPHandler
     
-    # Allow the socket to be reused
-    socketserver.TCPServer.allow_reuse_address = True
-    
-    with socketserver.TCPServer(("", port), handler) as httpd:
-        print(f"Server running on http://{get_local_ip()}:{port}")
-        httpd.serve_forever()
+    httpd = NetworkTestServer(("", port), handler)
+    server_thread = threading.Thread(target=httpd.serve_forever, name=f'network-test-{port}')
+    # Daemon thread so it never keeps the program alive on its own
+    server_thread.daemon = True
+    server_thread.start()
+    print(f"Server running on http://{get_local_ip()}:{port}")
+    return httpd
 
 def run_network_ports_test():
     """
@@ -111,6 +144,7 @@ def run_network_ports_test():
     Returns:
         int: Exit code (0 for success, 1 for error)
     """
+    servers = []
     try:
         # Get and display the local IP
         local_ip = get_local_ip()
@@ -118,16 +152,9 @@ def run_network_ports_test():
         print("Starting network connectivity test servers...")
         print("Testing ports 8000 and 8080...")
         
-        # Create and start threads for each server
-        thread1 = threading.Thread(target=start_server, args=(8000,))
-        thread2 = threading.Thread(target=start_server, args=(8080,))
-        
-        # Set as daemon threads so they exit when the main program exits
-        thread1.daemon = True
-        thread2.daemon = True
-        
-        thread1.start()
-        thread2.start()
+        # Start a server for each port
+        for port in (8000, 8080):
+            servers.append(start_server(port))
         
         print("\nNetwork test servers are running!")
         print(f"To test from this device, visit:")
@@ -138,16 +165,22 @@ def run_network_ports_test():
         print(f"  http://{local_ip}:8080")
         print("\nPress Ctrl+C to stop the servers...")
         
-        try:
-            # Keep the main thread alive
-            thread1.join()
-        except KeyboardInterrupt:
-            print("\nNetwork test servers stopped.")
-            return 0
+        # Wait for Ctrl+C or SIGTERM; the timed wait lets the signal be
+        # handled on every platform
+        stop_event = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda sig, frame: stop_event.set())
+        while not stop_event.wait(STOP_POLL_SECONDS):
+            pass
+        print("\nNetwork test servers stopped.")
             
     except Exception as e:
         print(f"Error running network test: {e}")
         return 1
+    finally:
+        for httpd in servers:
+            httpd.shutdown()
+            httpd.server_close()
     
     return 0
 
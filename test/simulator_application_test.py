@@ -10,7 +10,8 @@ Functions:
 """
 
 import sys
-import time
+import signal
+import threading
 import logging
 import os
 
@@ -20,12 +21,15 @@ sys.path.insert(0, project_root)
 
 from config import CONFIG
 from core import PowerMeterDataManager, PowerMeterSimulator
-from core.database_handler import DatabaseHandler
 from web import start_smart_server as start_test_server
 from api import PowerMeterHTTPServer
 
 logger = logging.getLogger('powermeter.simulator_test')
 
+# Longest the main thread blocks at a time. Untimed waits are not
+# interrupted by Ctrl+C on Windows, so the wait is re-armed periodically.
+SHUTDOWN_POLL_SECONDS = 5
+
 def run_simulator_test():
     """
     Run the power meter test application with simulator
@@ -50,47 +54,19 @@ def run_simulator_test():
     # Create simulated reader instead of real hardware
     reader = PowerMeterSimulator()
     
-    # Create custom data manager that maintains the simulator's interface
-    class CustomPowerMeterDataManager(PowerMeterDataManager):
-        def __init__(self, reader, poll_interval=5):
-            """Initialize with database support"""
-            self.reader = reader
-            self.poll_interval = poll_interval
-            self.meter_data = {}
-            self.running = False
-            self._thread = None
-            self.db_handler = DatabaseHandler()
-            
-        def _read_meter_loop(self):
-            """Continuously read from the meter"""
-            while self.running:
-                try:
-                    # Use detailed data if configured
-                    if CONFIG.get('DETAILED_DATA', False):
-                        data = self.reader.read_detailed_data()
-                    else:
-                        data = self.reader.read_basic_data()
-                        
-                    if data is not None:
-                        self.meter_data = data
-                        
-                        power = data.get('system', {}).get('power_kw', data.get('power_kw', 'N/A'))
-                        
-                        # Store in database if enabled
-                        if self.db_handler.enabled:
-                            self.db_handler.store_reading(data)
-                        
-                        logger.info(f"Updated readings: Power={power}kW")
-                except Exception as e:
-                    logger.error(f"Error in meter reading loop: {str(e)}")
-                time.sleep(self.poll_interval)
-    
     # Create data manager with simulator
-    data_manager = CustomPowerMeterDataManager(reader, 2)  # Poll every 2 seconds
+    data_manager = PowerMeterDataManager(reader, 2)  # Poll every 2 seconds
     
     # Create HTTP API server
     http_server = PowerMeterHTTPServer(CONFIG['HTTP_PORT'], data_manager)
     
+    # Set by Ctrl+C or a supervisor's SIGTERM to stop the application
+    stop = threading.Event()
+    previous_handlers = {
+        signum: signal.signal(signum, lambda signum, frame: stop.set())
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    
     try:
         # Start test HTML page server
         start_test_server(8000)
@@ -111,15 +87,16 @@ def run_simulator_test():
             
         logger.info("Press Ctrl+C to exit.")
         
-        # Keep main thread alive until keyboard interrupt
-        while True:
-            time.sleep(1)
+        # Keep main thread alive until a shutdown signal arrives
+        while not stop.wait(SHUTDOWN_POLL_SECONDS):
+            pass
+        logger.info("Shutdown signal received. Shutting down.")
             
-    except KeyboardInterrupt:
-        logger.info("Interrupt received. Shutting down.")
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
     finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
         # Clean shutdown
         http_server.stop()
         data_manager.stop()
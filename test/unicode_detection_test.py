@@ -11,11 +11,33 @@ Functions:
     run_unicode_detection_test: Main function to run unicode detection
 """
 
+import bisect
 import os
+import re
 import sys
-# import chardet
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Print every file checked (UNICODE_SCAN_VERBOSE=1), not just periodic progress
+_VERBOSE = bool(os.environ.get('UNICODE_SCAN_VERBOSE'))
+_PROGRESS_EVERY = 500
+
+# File extensions to check (lowercase, as a tuple for str.endswith)
+_TEXT_EXTENSIONS = (
+    '.py', '.txt', '.md', '.rst', '.yaml', '.yml', 
+    '.json', '.cfg', '.ini', '.conf', '.sh', '.bat'
+)
+
+# Directories to skip
+_SKIP_DIRS = frozenset({
+    'venv', '__pycache__', '.git', 'node_modules', 
+    '.pytest_cache', 'build', 'dist', '.vscode',
+    'site-packages'
+})
+
+# Any character outside the 7-bit ASCII range
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
 def check_file_for_unicode(file_path):
     """
     Check a single file for unicode characters
@@ -35,37 +57,42 @@ def check_file_for_unicode(file_path):
     }
     
     try:
-        # First, detect the file encoding
+        # Read the file once; everything below works from these bytes
         with open(file_path, 'rb') as f:
             raw_data = f.read()
-            
-        # Detect encoding
-        encoding_result = chardet.detect(raw_data)
-        results['encoding'] = encoding_result.get('encoding', 'unknown')
         
-        # Try to read the file as text
+        # Pure ASCII files (the common case) need no character-level scan
+        if raw_data.isascii():
+            results['encoding'] = 'ascii'
+            return results
+            
+        # Decode as UTF-8, dropping any invalid sequences
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = raw_data.decode('utf-8')
+            results['encoding'] = 'utf-8'
         except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-            except Exception as e:
-                results['error'] = f"Could not read file: {e}"
-                return results
+            content = raw_data.decode('utf-8', errors='ignore')
+            results['encoding'] = 'unknown (not valid UTF-8)'
         
-        # Check each character
+        # Normalize line endings as text mode reading would
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        
+        # Locate non-ASCII characters; line numbers come from the newline offsets
         unicode_positions = []
-        for i, char in enumerate(content):
-            if ord(char) > 127:  # Non-ASCII character
-                unicode_positions.append({
-                    'position': i,
-                    'char': char,
-                    'ord': ord(char),
-                    'line': content[:i].count('\n') + 1,
-                    'column': i - content.rfind('\n', 0, i)
-                })
+        newlines = None
+        for match in _NON_ASCII.finditer(content):
+            if newlines is None:
+                newlines = [m.start() for m in re.finditer('\n', content)]
+            i = match.start()
+            char = match.group()
+            line = bisect.bisect_right(newlines, i)
+            unicode_positions.append({
+                'position': i,
+                'char': char,
+                'ord': ord(char),
+                'line': line + 1,
+                'column': i - (newlines[line - 1] if line else -1)
+            })
         
         if unicode_positions:
             results['has_unicode'] = True
@@ -76,6 +103,35 @@ def check_file_for_unicode(file_path):
     
     return results
 
+def _iter_text_files(root, skip_dirs, text_extensions):
+    """
+    Yield paths of text files under root, without descending into skipped directories
+    
+    Args:
+        root (str): Directory to search
+        skip_dirs (set): Directory names to skip
+        text_extensions (tuple): Lowercase file extensions to include
+        
+    Yields:
+        str: Path of each matching file
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                # DirEntry caches the file type, so this needs no extra stat
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in skip_dirs:
+                        stack.append(entry.path)
+                elif name.lower().endswith(text_extensions):
+                    yield entry.path
+
 def scan_project_for_unicode(project_root):
     """
     Scan entire project for unicode characters
@@ -88,19 +144,6 @@ def scan_project_for_unicode(project_root):
     """
     project_path = Path(project_root)
     
-    # File extensions to check
-    text_extensions = {
-        '.py', '.txt', '.md', '.rst', '.yaml', '.yml', 
-        '.json', '.cfg', '.ini', '.conf', '.sh', '.bat'
-    }
-    
-    # Directories to skip
-    skip_dirs = {
-        'venv', '__pycache__', '.git', 'node_modules', 
-        '.pytest_cache', 'build', 'dist', '.vscode',
-        'site-packages'
-    }
-    
     scan_results = {
         'total_files_scanned': 0,
         'files_with_unicode': [],
@@ -112,29 +155,26 @@ def scan_project_for_unicode(project_root):
     print("Checking for unicode characters in text files...")
     print("=" * 60)
     
-    for root, dirs, files in os.walk(project_path):
-        # Skip certain directories
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_ext = Path(file).suffix.lower()
+    # Collect the text files to check
+    file_paths = list(_iter_text_files(str(project_path), _SKIP_DIRS, _TEXT_EXTENSIONS))
+    
+    # Check files concurrently so reads overlap; results come back in order
+    with ThreadPoolExecutor() as executor:
+        for file_path, result in zip(file_paths, executor.map(check_file_for_unicode, file_paths)):
+            scan_results['total_files_scanned'] += 1
+            relative_path = os.path.relpath(file_path, project_root)
             
-            # Only check text files
-            if file_ext in text_extensions:
-                scan_results['total_files_scanned'] += 1
-                relative_path = os.path.relpath(file_path, project_root)
-                
+            if _VERBOSE:
                 print(f"Checking: {relative_path}")
-                
-                result = check_file_for_unicode(file_path)
-                
-                if result['error']:
-                    scan_results['errors'].append(result)
-                elif result['has_unicode']:
-                    scan_results['files_with_unicode'].append(result)
-                else:
-                    scan_results['clean_files'].append(relative_path)
+            elif scan_results['total_files_scanned'] % _PROGRESS_EVERY == 0:
+                print(f"... {scan_results['total_files_scanned']} files scanned")
+            
+            if result['error']:
+                scan_results['errors'].append(result)
+            elif result['has_unicode']:
+                scan_results['files_with_unicode'].append(result)
+            else:
+                scan_results['clean_files'].append(relative_path)
     
     return scan_results
 
@@ -11,14 +11,56 @@ Functions:
 import sys
 import os
 import time
-import urllib.request
-import urllib.error
+import socket
+import http.client
 from pathlib import Path
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
+# Seconds to keep the server up after the checks for manual browsing
+# (WEB_REDIRECT_TEST_HOLD=10 restores the old behaviour)
+_HOLD_SECONDS = float(os.environ.get('WEB_REDIRECT_TEST_HOLD', '0'))
+
+def _wait_for_server(host, port, timeout):
+    """
+    Wait until a server accepts connections on host:port
+    
+    Args:
+        host (str): Host name to connect to
+        port (int): Port to connect to
+        timeout (float): Maximum seconds to wait
+    
+    Returns:
+        bool: True if the server is accepting connections
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+def _get(connection, path):
+    """
+    Send a GET over an existing connection without following redirects
+    
+    Args:
+        connection (http.client.HTTPConnection): Connection to the server
+        path (str): Request path
+    
+    Returns:
+        http.client.HTTPResponse: Response with its body already read
+    """
+    connection.request('GET', path)
+    response = connection.getresponse()
+    response.read()
+    return response
+
 def run_web_redirect_test():
     """
     Test the web server redirect functionality
@@ -39,38 +81,34 @@ def run_web_redirect_test():
         print("Starting smart web server on port 8001...")  # Use different port to avoid conflicts
         server_thread = start_smart_server(8001)
         
-        # Give the server time to start
-        time.sleep(2)
+        # Wait for the server to accept connections
+        _wait_for_server('localhost', 8001, 2)
         
         print("Testing redirect functionality...")
         
+        # One connection is reused for every probe
+        connection = http.client.HTTPConnection('localhost', 8001, timeout=5)
+        
         # Test accessing root path
         try:
             print("\n1. Testing http://localhost:8001/")
             
-            # Create a request that doesn't follow redirects automatically
-            request = urllib.request.Request('http://localhost:8001/')
+            response = _get(connection, '/')
+            print(f"   Status: {response.status}")
             
-            try:
-                response = urllib.request.urlopen(request)
-                print(f"   Status: {response.getcode()}")
-                print(f"   Final URL: {response.geturl()}")
+            if response.status == 302:
+                location = response.getheader('Location', 'Unknown')
+                print(f"   SUCCESS: Redirect (302) to {location}")
                 
-                if 'monitor' in response.geturl():
-                    print("   SUCCESS: Redirected to monitor page!")
-                    success = True
-                else:
-                    print("   ISSUE: No redirect to monitor page detected")
-                    success = False
-                    
-            except urllib.error.HTTPError as e:
-                if e.code == 302:
-                    location = e.headers.get('Location', 'Unknown')
-                    print(f"   SUCCESS: Redirect (302) to {location}")
-                    success = True
-                else:
-                    print(f"   HTTP Error {e.code}: {e.reason}")
-                    success = False
+                # Follow the redirect and make sure the page is served
+                target = _get(connection, location)
+                print(f"   Final URL: http://localhost:8001{location} (status {target.status})")
+                success = 'monitor' in location and target.status == 200
+                if not success:
+                    print("   ISSUE: Redirect target is not a served monitor page")
+            else:
+                print("   ISSUE: No redirect to monitor page detected")
+                success = False
             
         except Exception as e:
             print(f"   Connection error: {e}")
@@ -91,16 +129,25 @@ def run_web_redirect_test():
         print(f"   Open your browser and go to: http://localhost:8001/")
         print(f"   You should be automatically redirected to monitor.html")
         print(f"   (or monitor_modern.html if DASHBOARD_STYLE is 'modern')")
+        if _HOLD_SECONDS <= 0:
+            print(f"   Set WEB_REDIRECT_TEST_HOLD=<seconds> to keep the server up for this")
         
         print(f"\n4. Direct access test:")
-        print(f"   http://localhost:8001/monitor.html - Classic interface")
-        print(f"   http://localhost:8001/monitor_modern.html - Modern interface")
-        
-        print(f"\nWeb server is running on port 8001...")
-        print(f"Test will run for 10 seconds, then auto-stop...")
+        for path, description in (('/monitor.html', 'Classic interface'),
+                                  ('/monitor_modern.html', 'Modern interface')):
+            try:
+                status = _get(connection, path).status
+            except Exception as e:
+                status = f"error ({e})"
+            print(f"   http://localhost:8001{path} - {description}: {status}")
+        connection.close()
         
-        # Run for 10 seconds then stop
-        time.sleep(10)
+        if _HOLD_SECONDS > 0:
+            print(f"\nWeb server is running on port 8001...")
+            print(f"Test will run for {_HOLD_SECONDS:g} seconds, then auto-stop...")
+            
+            # Keep the server up for manual checks, then stop
+            time.sleep(_HOLD_SECONDS)
         print(f"\nStopping web server...")
         
         return 0 if success else 1
@@ -4,13 +4,23 @@ Web interface package for power meter monitoring system
 
 __version__ = '1.0.0'
 
-# Import static server functions for easier access
-from .static_server import (
-    serve_static_files, 
-    start_static_server,
-    start_smart_server,
-    get_default_monitor_page
-)
+# Static server functions, imported from .static_server on first access so
+# importing the package doesn't pull in the HTTP server modules
+_LAZY_EXPORTS = frozenset({
+    'serve_static_files', 
+    'start_static_server',
+    'start_smart_server',
+    'get_default_monitor_page'
+})
+
+def __getattr__(name):
+    """Load static server functions on first use"""
+    if name in _LAZY_EXPORTS:
+        from . import static_server
+        value = getattr(static_server, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Define package exports
 __all__ = [
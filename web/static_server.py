@@ -2,48 +2,319 @@
 Static file server for web interface with automatic redirection
 """
 import http.server
-import socketserver
+import email.utils
+import functools
+import gzip
+import io
+import mimetypes
 import os
 import threading
+import time
 import logging
-from urllib.parse import urlparse
 
 logger = logging.getLogger('powermeter.web.static_server')
 
+# Browsers may keep static files but must revalidate them (a cheap 304) before use
+STATIC_CACHE_CONTROL = 'no-cache'
+
+# Most requests a static file server handles at once
+WEB_MAX_WORKERS = 8
+
+# Longest a start_*_server call waits for the listening socket
+SERVER_START_TIMEOUT = 5
+
+# Files up to this size are kept in memory; larger ones are sent from disk
+STATIC_CACHE_MAX_BYTES = 256 * 1024
+
+# Seconds between checks that a cached file hasn't changed on disk
+STATIC_CACHE_REVALIDATE_SECONDS = 5
+
+# Smaller bodies aren't worth compressing
+GZIP_MIN_BYTES = 512
+
+def _file_etag(stat_result):
+    """Entity tag for a file, derived from its modification time and size"""
+    return '"%x-%x"' % (stat_result.st_mtime_ns, stat_result.st_size)
+
+class _CachedFile:
+    """In-memory copy of a static file with its precomputed response headers"""
+    
+    def __init__(self, stat_result, body, content_type):
+        self.mtime_ns = stat_result.st_mtime_ns
+        self.mtime = stat_result.st_mtime
+        self.size = stat_result.st_size
+        self.body = body
+        self.content_type = content_type
+        self.etag = _file_etag(stat_result)
+        self.last_modified = email.utils.formatdate(stat_result.st_mtime, usegmt=True)
+        # Only keep a compressed copy when it is actually smaller
+        self.gzip_body = None
+        if len(body) >= GZIP_MIN_BYTES and content_type.startswith(('text/', 'application/javascript')):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.gzip_body = compressed
+        self.checked_at = time.monotonic()
+
+class StaticFileCache:
+    """
+    Keeps the dashboard files in memory, with gzip-compressed copies
+    
+    Entries are checked against the file on disk at most every
+    STATIC_CACHE_REVALIDATE_SECONDS, so edited templates are picked up
+    without restarting the server.
+    """
+    
+    def __init__(self, root):
+        """
+        Initialize the cache
+        
+        Parameters:
+        - root: Directory whose files are cached
+        """
+        self.root = os.path.abspath(root)
+        # Absolute file path -> _CachedFile
+        self._files = {}
+    
+    def preload(self):
+        """
+        Load every cacheable file under the root directory
+        
+        Returns:
+        - Number of files loaded
+        """
+        pending = [self.root]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        self.get(entry.path)
+        return len(self._files)
+    
+    def get(self, path):
+        """
+        Look up a file, loading or reloading it if needed
+        
+        Parameters:
+        - path: Absolute filesystem path of the requested file
+        
+        Returns:
+        - _CachedFile, or None if the file should be served from disk
+        """
+        cached = self._files.get(path)
+        now = time.monotonic()
+        if cached is not None and now - cached.checked_at < STATIC_CACHE_REVALIDATE_SECONDS:
+            return cached
+        
+        if not path.startswith(self.root + os.sep):
+            return None
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            self._files.pop(path, None)
+            return None
+        if not os.path.isfile(path) or stat_result.st_size > STATIC_CACHE_MAX_BYTES:
+            self._files.pop(path, None)
+            return None
+        
+        if cached is not None and (cached.mtime_ns, cached.size) == (stat_result.st_mtime_ns, stat_result.st_size):
+            cached.checked_at = now
+            return cached
+        
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        cached = _CachedFile(stat_result, body, content_type)
+        self._files[path] = cached
+        return cached
+
+class StaticHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server that caps how many requests are handled at once,
+    so a slow client doesn't hold up other browsers"""
+    
+    # Don't keep the process alive for a client that never finishes its request
+    daemon_threads = True
+    
+    # Pending connections the kernel queues while every worker is busy
+    # (socketserver's default of 5 drops browsers reconnecting together)
+    request_queue_size = 128
+    
+    def __init__(self, server_address, handler_class, max_workers=WEB_MAX_WORKERS, file_cache=None):
+        """
+        Initialize the threaded server
+        
+        Parameters:
+        - server_address: (host, port) tuple to bind to
+        - handler_class: Request handler class
+        - max_workers: Maximum number of requests handled concurrently
+        - file_cache: Optional StaticFileCache the handlers serve files from
+        """
+        super().__init__(server_address, handler_class)
+        self._workers = threading.BoundedSemaphore(max_workers)
+        self.file_cache = file_cache
+    
+    def process_request(self, request, client_address):
+        """Start a handler thread once a worker slot is free"""
+        self._workers.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._workers.release()
+            raise
+    
+    def process_request_thread(self, request, client_address):
+        """Handle one connection and give its worker slot back"""
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._workers.release()
+
 class PowerMeterHTTPHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP handler with automatic redirection to monitor.html"""
     
+    # ETag of the file being served, added to the response headers
+    _etag = None
+    
+    # Send the headers as soon as they are written rather than waiting on Nagle
+    disable_nagle_algorithm = True
+    
+    # Paths (without query string) redirected to the monitor page
+    REDIRECT_PATHS = frozenset({'/', '', '/monitor'})
+    
+    def monitor_location(self):
+        """Location the root and /monitor paths redirect to"""
+        return '/monitor.html'
+    
     def do_GET(self):
         """Handle GET requests with automatic redirection"""
-        parsed_path = urlparse(self.path)
-        
-        # If accessing root path, redirect to monitor.html
-        if parsed_path.path == '/' or parsed_path.path == '':
+        # If accessing the root path or /monitor without .html, redirect to
+        # the monitor page
+        if self.path.split('?', 1)[0] in self.REDIRECT_PATHS:
             self.send_response(302)  # Found (redirect)
-            self.send_header('Location', '/monitor.html')
-            self.end_headers()
-            return
-        
-        # If accessing /monitor without .html, redirect to monitor.html
-        if parsed_path.path == '/monitor':
-            self.send_response(302)
-            self.send_header('Location', '/monitor.html')
+            self.send_header('Location', self.monitor_location())
             self.end_headers()
             return
         
         # For all other requests, use the default handler
         super().do_GET()
     
+    def send_head(self):
+        """
+        Send the response headers and return the body to copy
+        
+        Cached files are answered from memory, gzip-compressed when the
+        client accepts it. Other files are served by the default handler.
+        Either way, conditional requests for unchanged files get a 304 Not
+        Modified; end_headers() adds the ETag and Cache-Control.
+        """
+        self._etag = None
+        path = self.translate_path(self.path)
+        
+        file_cache = getattr(self.server, 'file_cache', None)
+        cached = file_cache.get(path) if file_cache is not None else None
+        if cached is not None:
+            return self._send_cached(cached)
+        
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return super().send_head()
+        if not os.path.isfile(path):
+            return super().send_head()
+        
+        self._etag = _file_etag(stat_result)
+        if self._etag_matches(self._etag):
+            self.send_response(304)
+            self.send_header('Last-Modified', self.date_time_string(stat_result.st_mtime))
+            self.end_headers()
+            return None
+        return super().send_head()
+    
+    def _etag_matches(self, etag):
+        """Check whether the request's If-None-Match covers the given ETag"""
+        if_none_match = self.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        tags = [tag.strip().replace('W/', '', 1) for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+    
+    def _send_cached(self, cached):
+        """
+        Send the headers for a file held in the static file cache
+        
+        Parameters:
+        - cached: _CachedFile to serve
+        
+        Returns:
+        - File object holding the body, or None for a 304 response
+        """
+        self._etag = cached.etag
+        not_modified = self._etag_matches(cached.etag)
+        if not not_modified and 'If-None-Match' not in self.headers and 'If-Modified-Since' in self.headers:
+            try:
+                since = email.utils.parsedate_to_datetime(self.headers['If-Modified-Since'])
+            except (TypeError, IndexError, OverflowError, ValueError):
+                since = None
+            if since is not None and since.tzinfo is not None:
+                not_modified = int(cached.mtime) <= since.timestamp()
+        
+        if not_modified:
+            self.send_response(304)
+            self.send_header('Last-Modified', cached.last_modified)
+            self.end_headers()
+            return None
+        
+        body = cached.body
+        self.send_response(200)
+        self.send_header('Content-type', cached.content_type)
+        if cached.gzip_body is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body = cached.gzip_body
+                self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', cached.last_modified)
+        self.end_headers()
+        return io.BytesIO(body)
+    
+    def end_headers(self):
+        """Add caching headers for static files before ending the headers"""
+        if self._etag is not None:
+            self.send_header('ETag', self._etag)
+            self.send_header('Cache-Control', STATIC_CACHE_CONTROL)
+            self._etag = None
+        super().end_headers()
+    
+    def copyfile(self, source, outputfile):
+        """
+        Copy a file body to the client
+        
+        The body is handed to the socket with sendfile() so the kernel copies
+        it straight from the page cache; socket.sendfile() falls back to
+        plain reads and sends for in-memory bodies such as directory listings.
+        """
+        if outputfile is self.wfile:
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+    
     def log_message(self, format, *args):
         """Custom logging to use our logger"""
-        logger.info(f"{self.client_address[0]} - {format % args}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"{self.client_address[0]} - {format % args}")
 
-def serve_static_files(port=8000):
+def serve_static_files(port=8000, ready=None):
     """
     Serve static files from the web/templates directory with auto-redirect
     
     Parameters:
     - port: TCP port to listen on
+    - ready: Optional threading.Event set once the server is listening,
+      or as soon as it fails to start
     """
     # Get the web templates directory
     web_dir = os.path.join(
@@ -54,6 +325,8 @@ def serve_static_files(port=8000):
     # Ensure the directory exists
     if not os.path.exists(web_dir):
         logger.error(f"Web templates directory does not exist: {web_dir}")
+        if ready is not None:
+            ready.set()
         return
     
     # Check if monitor.html exists
@@ -65,15 +338,17 @@ def serve_static_files(port=8000):
             if file.endswith('.html'):
                 logger.info(f"  - {file}")
     
-    # Change to web directory
-    original_cwd = os.getcwd()
-    os.chdir(web_dir)
-    
     try:
-        # Create and start HTTP server with custom handler
-        handler = PowerMeterHTTPHandler
-        httpd = socketserver.TCPServer(("", port), handler)
-        httpd.allow_reuse_address = True
+        # Create and start HTTP server with custom handler; files are served
+        # from web_dir without changing the process working directory
+        handler = functools.partial(PowerMeterHTTPHandler, directory=web_dir)
+        file_cache = StaticFileCache(web_dir)
+        file_cache.preload()
+        
+        # HTTPServer already enables allow_reuse_address before binding
+        httpd = StaticHTTPServer(("", port), handler, file_cache=file_cache)
+        if ready is not None:
+            ready.set()
         
         logger.info(f"Web interface available at http://localhost:{port}/")
         logger.info(f"Automatic redirect to monitor.html enabled")
@@ -83,8 +358,9 @@ def serve_static_files(port=8000):
     except Exception as e:
         logger.error(f"Error starting web server: {e}")
     finally:
-        # Restore original working directory
-        os.chdir(original_cwd)
+        # Don't leave the caller waiting if the server never came up
+        if ready is not None:
+            ready.set()
 
 def start_static_server(port=8000):
     """
@@ -96,20 +372,24 @@ def start_static_server(port=8000):
     Returns:
     - Thread object for the server
     """
-    server_thread = threading.Thread(target=serve_static_files, args=(port,))
+    ready = threading.Event()
+    server_thread = threading.Thread(target=serve_static_files, args=(port, ready))
     server_thread.daemon = True
     server_thread.start()
     
-    # Give the server a moment to start
-    import time
-    time.sleep(0.5)
+    # Return as soon as the server is listening (or has failed to start)
+    if not ready.wait(SERVER_START_TIMEOUT):
+        logger.warning(f"Web server on port {port} did not start within {SERVER_START_TIMEOUT}s")
     
     return server_thread
 
+@functools.lru_cache(maxsize=1)
 def get_default_monitor_page():
     """
     Determine which monitor page to use based on configuration
     
+    The configuration is read-only, so the result is worked out once.
+    
     Returns:
     - str: Filename of the monitor page to use
     """
@@ -128,28 +408,9 @@ def get_default_monitor_page():
 class SmartPowerMeterHTTPHandler(PowerMeterHTTPHandler):
     """Enhanced handler that selects monitor page based on config"""
     
-    def do_GET(self):
-        """Handle GET requests with smart monitor page selection"""
-        parsed_path = urlparse(self.path)
-        
-        # If accessing root path, redirect to appropriate monitor page
-        if parsed_path.path == '/' or parsed_path.path == '':
-            monitor_page = get_default_monitor_page()
-            self.send_response(302)
-            self.send_header('Location', f'/{monitor_page}')
-            self.end_headers()
-            return
-        
-        # If accessing /monitor without .html, redirect to appropriate monitor page
-        if parsed_path.path == '/monitor':
-            monitor_page = get_default_monitor_page()
-            self.send_response(302)
-            self.send_header('Location', f'/{monitor_page}')
-            self.end_headers()
-            return
-        
-        # For all other requests, use the parent handler
-        super().do_GET()
+    def monitor_location(self):
+        """Redirect to the monitor page chosen by DASHBOARD_STYLE"""
+        return '/' + get_default_monitor_page()
 
 def start_smart_server(port=8000):
     """
@@ -161,7 +422,7 @@ def start_smart_server(port=8000):
     Returns:
     - Thread object for the server
     """
-    def serve_smart_files(port):
+    def serve_smart_files(port, ready):
         """Serve files with smart monitor page selection"""
         web_dir = os.path.join(
             os.path.dirname(os.path.dirname(__file__)),
@@ -170,15 +431,15 @@ def start_smart_server(port=8000):
         
         if not os.path.exists(web_dir):
             logger.error(f"Web templates directory does not exist: {web_dir}")
+            ready.set()
             return
         
-        original_cwd = os.getcwd()
-        os.chdir(web_dir)
-        
         try:
-            handler = SmartPowerMeterHTTPHandler
-            httpd = socketserver.TCPServer(("", port), handler)
-            httpd.allow_reuse_address = True
+            handler = functools.partial(SmartPowerMeterHTTPHandler, directory=web_dir)
+            file_cache = StaticFileCache(web_dir)
+            file_cache.preload()
+            httpd = StaticHTTPServer(("", port), handler, file_cache=file_cache)
+            ready.set()
             
             monitor_page = get_default_monitor_page()
             logger.info(f"Smart web interface available at http://localhost:{port}/")
@@ -189,13 +450,15 @@ def start_smart_server(port=8000):
         except Exception as e:
             logger.error(f"Error starting smart web server: {e}")
         finally:
-            os.chdir(original_cwd)
+            ready.set()
     
-    server_thread = threading.Thread(target=serve_smart_files, args=(port,))
+    ready = threading.Event()
+    server_thread = threading.Thread(target=serve_smart_files, args=(port, ready))
     server_thread.daemon = True
     server_thread.start()
     
-    import time
-    time.sleep(0.5)
+    # Return as soon as the server is listening (or has failed to start)
+    if not ready.wait(SERVER_START_TIMEOUT):
+        logger.warning(f"Smart web server on port {port} did not start within {SERVER_START_TIMEOUT}s")
     
     return server_thread
@@ -63,6 +63,28 @@ async function readRegisters(startRegister, count) {
     }
 }
 
+/**
+ * Read a list of registers in one request
+ * @param {Array} registerNumbers - Register numbers to read
+ * @returns {Promise} Promise resolving to an array of register data, in request order
+ */
+async function readRegisterBatch(registerNumbers) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/register_batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(registerNumbers)
+        });
+        if (!response.ok) {
+            throw new Error(`HTTP error ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('Error reading register batch:', error);
+        throw error;
+    }
+}
+
 /**
  * Send a raw Modbus command
  * @param {Array} commandBytes - Array of command bytes
@@ -86,4 +108,4 @@ async function sendModbusCommand(commandBytes) {
 }
 
 // Export functions for use in other modules
-export { fetchMeterData, readRegister, readRegisters, sendModbusCommand };
\ No newline at end of file
+export { fetchMeterData, readRegister, readRegisters, readRegisterBatch, sendModbusCommand };
\ No newline at end of file
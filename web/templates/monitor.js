@@ -371,13 +371,16 @@ function sendModbusCommand() {
             return response.json();
         })
         .then(data => {
+            // Decode the hex response into bytes
+            const responseBytes = (data.response_hex.match(/../g) || []).map(pair => parseInt(pair, 16));
+            
             // Display the raw response
-            const responseHex = data.response.map(byte => 
+            const responseHex = responseBytes.map(byte => 
                 byte.toString(16).padStart(2, '0').toUpperCase()).join(' ');
             document.getElementById('modbusResponse').textContent = responseHex;
             
             // Parse and display the formatted response
-            parseAndDisplayResponse(data.response);
+            parseAndDisplayResponse(responseBytes);
         })
         .catch(error => {
             console.error('Error enviando comando Modbus:', error);